@@ -0,0 +1,515 @@
+"""
+AI 전산 공지 생성기 - 오프라인 부하 테스트 / 벤치마크
+
+실제 Gemini API 대신 지연 시간을 주입한 가짜 모델을 사용하여
+/api/chat, 공지 CRUD, 공지 목록 API를 동시성 수준별로 호출하고
+처리량, p50/p95/p99 지연 시간, 이벤트 루프 지연, RSS 증가량을 측정합니다.
+서버는 같은 프로세스의 별도 스레드에서 uvicorn으로 실행되며(외부 네트워크 불필요),
+이벤트 루프 지연은 서버 루프에서 측정합니다.
+
+결과는 JSON으로 저장되어 커밋 간 회귀 비교에 사용할 수 있습니다.
+
+사용 예:
+    python -m benchmarks.bench_app
+    python -m benchmarks.bench_app --concurrency 1,8,32 --requests 200 --llm-latency-ms 50
+    python -m benchmarks.bench_app --compare benchmarks/results/이전결과.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import uvicorn
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SCENARIOS = ["chat", "create", "update", "get", "list", "delete"]
+
+SAMPLE_NOTICE = """### 생성된 공지 ###
+제목: 정기 전산 업데이트(2025.11.24)
+
+■ 요약
+적용시스템: [넷오피스, E-Commerce]
+업데이트 현확 요약
+업데이트 완료: 1건
+신규 업데이트: 1건
+일부반영 or 구조 변경: 0건
+업데이트 예정: 1건
+
+■ 업데이트 완료
+• 넷오피스
+    ○ 전자결재문서함 검색 기능 개선(2025.11.06)
+
+■ 신규 업데이트
+• E-Commerce
+    ○ 주문 일괄 취소 기능(2025.11.20)
+        ▪ 배경
+            • 대량 주문 취소 시 반복 작업 부담
+        ▪ 대상
+            • 영업지원팀
+        ▪ 변경
+            • 주문 목록에서 다중 선택 후 일괄 취소 가능
+        ▪ 경로
+            • E-Commerce > 주문관리 > 주문목록
+
+■ 업데이트 예정
+• 넷오피스
+    ○ 모바일 결재 알림(2025.12.01)
+        • 결재 요청 시 모바일 푸시 알림 발송
+
+업데이트 관련 궁금하신 점이 있을 경우 전산팀을 통해 문의해 주시기 바랍니다.
+
+감사합니다.
+### 생성 완료 ###"""
+
+
+SAMPLE_WORK_DATA = """- 넷오피스 전자결재문서함 검색 기능 개선 ~11/06
+  - 배경: 결재 진행 상태 확인 및 특정 문서 검색 편의성 강화
+  - 경로: 넷오피스 > 전자결재 시스템 > 상단 상세검색
+- E-Commerce 주문 일괄 취소 기능 251120
+  - 대상: 영업지원팀
+- 넷오피스 모바일 결재 알림 예정 ~12/01"""
+
+
+# ==================== 가짜 모델 ====================
+
+class FakeResponse:
+    """genai 응답 객체 흉내 (text 속성만 사용)"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """지연 시간을 주입한 가짜 Gemini 모델
+
+    실제 genai.GenerativeModel.generate_content와 마찬가지로 동기(time.sleep) 호출입니다.
+    서버는 모델 호출을 run_in_threadpool로 실행하므로 이 지연은 스레드풀 워커를 점유할 뿐
+    이벤트 루프를 막지 않습니다. 측정되는 루프 지연은 모델 호출 외의 핸들러 처리 시간입니다.
+    """
+
+    def __init__(self, latency_ms: float, jitter_ms: float = 0.0, notice_ratio: float = 0.2, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.notice_ratio = notice_ratio
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        self.calls += 1
+        delay = self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if self.random.random() < self.notice_ratio:
+            return FakeResponse(f"요청하신 공지를 작성했습니다.\n\n{SAMPLE_NOTICE}")
+        return FakeResponse("공지 날짜와 적용 시스템을 알려주세요.")
+
+
+def load_app(fake_model: FakeModel, fast_model: Optional[FakeModel] = None):
+    """main 모듈을 불러오고 모델을 가짜 모델로 교체 (fast_model이 있으면 fast 티어에 사용)"""
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark-dummy-key")
+    # 부하 생성 자체가 요청 제한에 걸리지 않도록 기본 비활성화 (환경 변수로 재정의 가능)
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    # 오래된 채팅 기록과 저널은 임시 디렉터리에 저장
+    data_dir = tempfile.mkdtemp(prefix="bench_")
+    os.environ.setdefault("CHAT_COLD_STORE_PATH", os.path.join(data_dir, "chat_history.db"))
+    os.environ.setdefault("JOURNAL_DIR", os.path.join(data_dir, "journal"))
+    # main.py는 static/, templates/ 등을 상대 경로로 참조
+    os.chdir(ROOT_DIR)
+    if str(ROOT_DIR) not in sys.path:
+        sys.path.insert(0, str(ROOT_DIR))
+
+    import main
+
+    for tier in main.model_router.models:
+        main.model_router.set_model(tier, fake_model)
+    if fast_model is not None:
+        main.model_router.set_model("fast", fast_model)
+    return main
+
+
+# ==================== 측정 도구 ====================
+
+def current_rss_kb() -> int:
+    """현재 프로세스 RSS(KB) - /proc를 사용할 수 없으면 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 바이트 단위
+    return maxrss // 1024 if sys.platform == "darwin" else maxrss
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """선형 보간 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def summarize_ms(values: List[float]) -> Dict[str, float]:
+    """지연 시간 목록(ms) 요약"""
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(values),
+        "mean": round(statistics.fmean(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3),
+    }
+
+
+class LoopLagMonitor:
+    """주기적으로 sleep 후 초과 시간을 측정해 이벤트 루프 지연을 기록"""
+
+    def __init__(self, interval_ms: float = 10.0):
+        self.interval = interval_ms / 1000
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - start - self.interval
+            self.samples.append(max(lag, 0.0) * 1000)
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        return summarize_ms(self.samples)
+
+
+# ==================== 시나리오 ====================
+
+def notice_form(i: int) -> dict:
+    return {
+        "title": f"정기 전산 업데이트 벤치마크 #{i}",
+        "content": SAMPLE_NOTICE,
+        "systems": "넷오피스,E-Commerce",
+        "date": "2025-11-24",
+    }
+
+
+async def seed_notices(client: httpx.AsyncClient, count: int) -> List[str]:
+    """조회/수정/삭제 시나리오에 사용할 공지 미리 생성"""
+    ids = []
+    for i in range(count):
+        res = await client.post("/api/notices", data=notice_form(i))
+        ids.append(res.json()["notice"]["id"])
+    return ids
+
+
+def make_request_factory(scenario: str, notice_ids: List[str], sessions: int) -> Callable[[httpx.AsyncClient, int], "asyncio.Future"]:
+    """시나리오별 요청 함수 생성 (i번째 요청)"""
+    if scenario == "chat":
+        def request(client, i):
+            # 5번 중 1번은 업무 데이터 붙여넣기, 나머지는 짧은 질의응답
+            message = SAMPLE_WORK_DATA if i % 5 == 0 else f"공지 날짜는 2025.11.24 입니다 ({i})"
+            return client.post("/api/chat", data={
+                "message": message,
+                "session_id": f"bench_session_{i % sessions}",
+            })
+    elif scenario == "create":
+        def request(client, i):
+            return client.post("/api/notices", data=notice_form(i))
+    elif scenario == "update":
+        def request(client, i):
+            return client.put(f"/api/notices/{notice_ids[i % len(notice_ids)]}", data={"title": f"수정된 공지 #{i}"})
+    elif scenario == "get":
+        def request(client, i):
+            return client.get(f"/api/notices/{notice_ids[i % len(notice_ids)]}")
+    elif scenario == "list":
+        def request(client, i):
+            return client.get("/api/notices")
+    elif scenario == "delete":
+        def request(client, i):
+            return client.delete(f"/api/notices/{notice_ids[i % len(notice_ids)]}")
+    else:
+        raise ValueError(f"알 수 없는 시나리오: {scenario}")
+    return request
+
+
+class ServerThread(threading.Thread):
+    """별도 스레드의 이벤트 루프에서 uvicorn 서버 실행
+
+    부하 생성 클라이언트와 서버의 이벤트 루프를 분리해야 서버 쪽 루프 지연(핸들러의
+    동기 처리, 저널/색인 등)이 클라이언트 부하와 섞이지 않고 측정됩니다.
+    """
+
+    def __init__(self, app):
+        super().__init__(daemon=True)
+        config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start_and_wait(self, timeout: float = 10.0) -> str:
+        self.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.is_alive():
+                raise RuntimeError("벤치마크 서버를 시작하지 못했습니다.")
+            time.sleep(0.01)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def call(self, coro, timeout: float = 30.0):
+        """서버 루프에서 코루틴을 실행하고 결과 반환"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.join(timeout=10)
+
+
+async def _start_monitor(monitor: LoopLagMonitor):
+    monitor.start()
+
+
+async def run_scenario(
+    server: ServerThread,
+    base_url: str,
+    scenario: str,
+    concurrency: int,
+    total_requests: int,
+    seed_count: int,
+    sessions: int,
+) -> dict:
+    """하나의 시나리오를 지정한 동시성으로 실행하고 결과 반환"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        # 삭제 시나리오는 요청마다 서로 다른 공지가 필요
+        needed = total_requests if scenario == "delete" else seed_count
+        notice_ids = await seed_notices(client, needed) if scenario in ("update", "get", "delete") else []
+        request = make_request_factory(scenario, notice_ids, sessions)
+
+        latencies: List[float] = []
+        status_counts: Dict[str, int] = {}
+        counter = iter(range(total_requests))
+        monitor = LoopLagMonitor()
+
+        async def worker():
+            for i in counter:
+                start = time.perf_counter()
+                res = await request(client, i)
+                latencies.append((time.perf_counter() - start) * 1000)
+                status_counts[str(res.status_code)] = status_counts.get(str(res.status_code), 0) + 1
+
+        rss_before = current_rss_kb()
+        server.call(_start_monitor(monitor))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        loop_lag = server.call(monitor.stop())
+        rss_after = current_rss_kb()
+
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(total_requests / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": summarize_ms(latencies),
+        "loop_lag_ms": loop_lag,
+        "rss_kb": {"before": rss_before, "after": rss_after, "growth": rss_after - rss_before},
+        "status_counts": status_counts,
+    }
+
+
+def reset_state(app_module):
+    """시나리오 간 간섭을 막기 위해 메모리 저장소 초기화"""
+    app_module.notices_db.clear()
+    app_module.notice_summaries.clear()
+    app_module.notices_by_id.clear()
+    app_module.scheduled_items_by_notice.clear()
+    app_module.latest_notice_by_system.clear()
+    app_module.notice_index.clear()
+    app_module.chat_sessions.clear()
+
+
+async def run_benchmark(args) -> dict:
+    fake_model = FakeModel(args.llm_latency_ms, args.llm_jitter_ms, args.notice_ratio, args.seed)
+    fast_model = None
+    if args.llm_fast_latency_ms is not None:
+        fast_model = FakeModel(args.llm_fast_latency_ms, args.llm_jitter_ms, 0.0, args.seed)
+    app_module = load_app(fake_model, fast_model)
+
+    rss_start = current_rss_kb()
+    server = ServerThread(app_module.app)
+    base_url = server.start_and_wait()
+    results = []
+    try:
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                reset_state(app_module)
+                result = await run_scenario(
+                    server, base_url, scenario, concurrency, args.requests, args.seed_notices, args.sessions
+                )
+                results.append(result)
+                print(
+                    f"{scenario:>7} c={concurrency:<4} "
+                    f"{result['throughput_rps']:>9.1f} req/s  "
+                    f"p50={result['latency_ms']['p50']:.2f}ms  "
+                    f"p95={result['latency_ms']['p95']:.2f}ms  "
+                    f"p99={result['latency_ms']['p99']:.2f}ms  "
+                    f"lag_max={result['loop_lag_ms']['max']:.1f}ms  "
+                    f"rss+={result['rss_kb']['growth']}KB"
+                )
+    finally:
+        server.stop()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "config": {
+                "scenarios": args.scenarios,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "llm_latency_ms": args.llm_latency_ms,
+                "llm_fast_latency_ms": args.llm_fast_latency_ms,
+                "llm_jitter_ms": args.llm_jitter_ms,
+                "notice_ratio": args.notice_ratio,
+                "seed_notices": args.seed_notices,
+                "sessions": args.sessions,
+                "seed": args.seed,
+            },
+            "llm_calls": fake_model.calls + (fast_model.calls if fast_model else 0),
+            "model_stats": app_module.model_router.snapshot(),
+            "rss_kb": {"start": rss_start, "end": current_rss_kb()},
+        },
+        "results": results,
+    }
+
+
+# ==================== 결과 저장/비교 ====================
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(report: dict, output: Optional[str]) -> Path:
+    if output:
+        path = Path(output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        commit = report["meta"]["git_commit"] or "nogit"
+        path = RESULTS_DIR / f"{stamp}-{commit}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def compare_results(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """기준 결과와 비교하여 threshold(비율) 이상 나빠진 항목 목록 반환"""
+    base_index = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'시나리오':<10}{'동시성':>6}{'처리량 변화':>14}{'p95 변화':>12}{'p99 변화':>12}")
+    for r in current["results"]:
+        base = base_index.get((r["scenario"], r["concurrency"]))
+        if not base:
+            continue
+        rps_delta = _ratio(r["throughput_rps"], base["throughput_rps"])
+        p95_delta = _ratio(r["latency_ms"]["p95"], base["latency_ms"]["p95"])
+        p99_delta = _ratio(r["latency_ms"]["p99"], base["latency_ms"]["p99"])
+        print(f"{r['scenario']:<10}{r['concurrency']:>6}{rps_delta:>+13.1%}{p95_delta:>+12.1%}{p99_delta:>+12.1%}")
+        if rps_delta < -threshold or p95_delta > threshold:
+            regressions.append(f"{r['scenario']} c={r['concurrency']}")
+    return regressions
+
+
+def _ratio(current: float, base: float) -> float:
+    return (current - base) / base if base else 0.0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI 전산 공지 생성기 오프라인 벤치마크")
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=SCENARIOS,
+                        help=f"실행할 시나리오 (쉼표 구분, 기본: {','.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", type=lambda s: [int(x) for x in s.split(",")], default=[1, 8, 32],
+                        help="동시성 수준 (쉼표 구분, 기본: 1,8,32)")
+    parser.add_argument("--requests", type=int, default=200, help="시나리오/동시성별 요청 수")
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0, help="가짜 모델 응답 지연(ms)")
+    parser.add_argument("--llm-fast-latency-ms", type=float, default=None,
+                        help="fast 티어 가짜 모델 응답 지연(ms, 기본: --llm-latency-ms와 동일)")
+    parser.add_argument("--llm-jitter-ms", type=float, default=0.0, help="가짜 모델 지연 편차(ms)")
+    parser.add_argument("--notice-ratio", type=float, default=0.2, help="공지 마커를 포함한 응답 비율")
+    parser.add_argument("--seed-notices", type=int, default=100, help="조회/수정 시나리오용 사전 생성 공지 수")
+    parser.add_argument("--sessions", type=int, default=16, help="채팅 시나리오에서 사용할 세션 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/<시각>-<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=0.1, help="회귀로 판단할 변화 비율 (기본: 0.1)")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+    path = save_results(report, args.output)
+    print(f"\n결과 저장: {path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n⚠️  회귀 감지: {', '.join(regressions)}")
+            return 1
+        print("\n✅ 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+저널 내구성 모드별 요청 지연 벤치마크
+
+JOURNAL_MODE(off / batched / sync)마다 별도 프로세스에서 bench_app을 실행하여
+쓰기 요청(공지 생성/수정/삭제, 채팅)의 처리량과 지연 시간을 비교합니다.
+
+사용 예:
+    python -m benchmarks.bench_journal
+    python -m benchmarks.bench_journal --concurrency 1,16 --requests 300 --batch-ms 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.bench_app import git_commit  # noqa: E402
+
+MODES = ["off", "batched", "sync"]
+
+
+def run_mode(mode: str, args) -> dict:
+    """한 모드로 bench_app을 실행하고 결과 JSON 반환"""
+    workdir = tempfile.mkdtemp(prefix=f"bench_journal_{mode}_")
+    output = os.path.join(workdir, "result.json")
+    env = {
+        **os.environ,
+        "JOURNAL_MODE": mode,
+        "JOURNAL_DIR": os.path.join(workdir, "journal"),
+        "JOURNAL_BATCH_MS": str(args.batch_ms),
+    }
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_app",
+         "--scenarios", args.scenarios,
+         "--concurrency", args.concurrency,
+         "--requests", str(args.requests),
+         "--llm-latency-ms", str(args.llm_latency_ms),
+         "--output", output],
+        cwd=ROOT_DIR, env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+    with open(output, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="저널 내구성 모드별 요청 지연 벤치마크")
+    parser.add_argument("--modes", type=lambda s: s.split(","), default=MODES)
+    parser.add_argument("--scenarios", default="create,update,delete,chat")
+    parser.add_argument("--concurrency", default="1,16")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--llm-latency-ms", type=float, default=5.0)
+    parser.add_argument("--batch-ms", type=float, default=10.0, help="batched 모드 group commit 간격")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/journal-<시각>-<커밋>.json)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": git_commit(),
+            "batch_ms": args.batch_ms,
+        },
+        "modes": {},
+    }
+    print(f"{'모드':<8}{'시나리오':<9}{'동시성':>6}{'req/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}")
+    for mode in args.modes:
+        result = run_mode(mode, args)
+        report["modes"][mode] = result["results"]
+        for r in result["results"]:
+            print(
+                f"{mode:<8}{r['scenario']:<9}{r['concurrency']:>6}"
+                f"{r['throughput_rps']:>10.1f}{r['latency_ms']['p50']:>10.2f}{r['latency_ms']['p99']:>10.2f}"
+            )
+
+    if args.output:
+        path = Path(args.output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = ROOT_DIR / "benchmarks" / "results" / f"journal-{stamp}-{report['meta']['git_commit'] or 'nogit'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+채팅 세션 메시지 메모리 사용량 벤치마크
+
+기존 dict 메시지(문자열 키 + ISO-8601 문자열 시각)와 chat_store의 Message/ChatHistory
+(정수 역할 + epoch 밀리초, hot/cold 분리)를 같은 데이터로 채워 RSS 증가량을 비교합니다.
+변형마다 별도 프로세스에서 실행하여 서로의 메모리 사용이 섞이지 않도록 합니다.
+
+사용 예:
+    python -m benchmarks.bench_memory                       # 10,000 세션 x 200 메시지
+    python -m benchmarks.bench_memory --sessions 1000 --messages 50
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.bench_app import current_rss_kb, git_commit  # noqa: E402
+
+VARIANTS = ["dict", "compact", "compact_cold"]
+
+
+def message_content(session: int, i: int) -> str:
+    """세션/순번마다 서로 다른 내용 (문자열 공유로 인한 과소 측정 방지)"""
+    if i % 2 == 0:
+        return f"공지 날짜는 2025.11.{i % 28 + 1:02d} 이고 적용 시스템은 넷오피스입니다. (세션 {session}, 메시지 {i})"
+    return f"확인했습니다. 세션 {session}의 {i}번째 답변입니다. 업데이트 내용을 알려주세요."
+
+
+def build_dict(sessions: int, messages: int) -> dict:
+    store = {}
+    for s in range(sessions):
+        history = []
+        for i in range(messages):
+            history.append({
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": message_content(s, i),
+                "timestamp": datetime.now().isoformat(),
+            })
+        store[f"session_{s}"] = {"messages": history}
+    return store
+
+
+def build_compact(sessions: int, messages: int, cold_path: str = None, hot_limit: int = 50) -> dict:
+    from chat_store import ChatHistory, ColdHistoryStore, Message
+
+    cold_store = ColdHistoryStore(cold_path) if cold_path else None
+    store = {}
+    for s in range(sessions):
+        session_id = f"session_{s}"
+        history = ChatHistory(session_id, cold_store, hot_limit)
+        for i in range(messages):
+            history.append(Message("user" if i % 2 == 0 else "assistant", message_content(s, i)))
+        store[session_id] = {"messages": history}
+    return store
+
+
+def run_variant(variant: str, sessions: int, messages: int, hot_limit: int) -> dict:
+    """현재 프로세스에서 변형 하나를 측정"""
+    gc.collect()
+    rss_before = current_rss_kb()
+    start = time.perf_counter()
+    if variant == "dict":
+        store = build_dict(sessions, messages)
+    elif variant == "compact":
+        store = build_compact(sessions, messages)
+    else:
+        cold_path = os.path.join(tempfile.mkdtemp(prefix="bench_memory_"), "chat_history.db")
+        store = build_compact(sessions, messages, cold_path, hot_limit)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    rss_after = current_rss_kb()
+    total = sessions * messages
+    result = {
+        "variant": variant,
+        "sessions": sessions,
+        "messages_per_session": messages,
+        "build_s": round(elapsed, 3),
+        "rss_growth_kb": rss_after - rss_before,
+        "bytes_per_message": round((rss_after - rss_before) * 1024 / total, 1),
+    }
+    if variant == "compact_cold":
+        result["hot_limit"] = hot_limit
+        result["cold_db_bytes"] = os.path.getsize(cold_path)
+    del store
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="채팅 메시지 메모리 사용량 벤치마크")
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--hot-limit", type=int, default=50, help="compact_cold 변형의 메모리 보관 메시지 수")
+    parser.add_argument("--variants", type=lambda s: s.split(","), default=VARIANTS)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/memory-<시각>-<커밋>.json)")
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    # 자식 프로세스: 변형 하나만 측정하고 JSON 출력
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.sessions, args.messages, args.hot_limit)))
+        return 0
+
+    results = []
+    for variant in args.variants:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_memory", "--variant", variant,
+             "--sessions", str(args.sessions), "--messages", str(args.messages),
+             "--hot-limit", str(args.hot_limit)],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(
+            f"{variant:>13}: RSS +{result['rss_growth_kb'] / 1024:8.1f}MB  "
+            f"{result['bytes_per_message']:7.1f} B/msg  build {result['build_s']:.2f}s"
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+        },
+        "results": results,
+    }
+    if args.output:
+        path = Path(args.output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = ROOT_DIR / "benchmarks" / "results" / f"memory-{stamp}-{report['meta']['git_commit'] or 'nogit'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+과거 공지 검색(retrieval.NoticeIndex) 지연 시간 벤치마크
+
+합성 공지 N건으로 색인을 만든 뒤, 그중 임의의 공지 항목으로 만든 업무 데이터로 검색하여
+색인 구축 시간, 검색 지연 시간(p50/p95/p99), 원본 공지가 상위 k개에 포함되는 비율, RSS 증가량을 측정합니다.
+
+사용 예:
+    python -m benchmarks.bench_retrieval                  # 100,000건
+    python -m benchmarks.bench_retrieval --notices 10000 --queries 200 --top-k 3
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.bench_app import current_rss_kb, git_commit, summarize_ms  # noqa: E402
+from retrieval import NoticeIndex  # noqa: E402
+
+SYSTEMS = ["Smart DERP/POS", "넷오피스", "E-Commerce", "그룹웨어", "인사관리", "회계관리"]
+MENUS = ["전자결재", "주문관리", "재고관리", "매출분석", "게시판", "근태관리", "전표관리", "고객관리", "배송관리", "정산"]
+OBJECTS = ["문서함", "주문목록", "거래처", "품목", "결재선", "알림", "엑셀 다운로드", "권한", "대시보드", "검색"]
+ACTIONS = ["검색 기능 개선", "일괄 처리 기능", "화면 구성 변경", "필터 추가", "속도 개선", "모바일 지원", "자동 저장", "오류 수정"]
+TEAMS = ["영업지원팀", "회계팀", "물류팀", "전 직원", "매장 관리자", "인사팀"]
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후"
+
+
+def make_details(rng: random.Random, count: int = 5000) -> list:
+    """실제 공지처럼 기능명마다 드물게 나오는 단어 (2~4음절 임의 단어)"""
+    return ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(count)]
+
+
+def make_item(rng: random.Random, day: date, details: list) -> tuple:
+    system = rng.choice(SYSTEMS)
+    menu, obj, action = rng.choice(MENUS), rng.choice(OBJECTS), rng.choice(ACTIONS)
+    name = f"{menu} {rng.choice(details)} {obj} {action}"
+    return system, menu, name, rng.choice(TEAMS), day.strftime("%Y.%m.%d")
+
+
+def make_notice(rng: random.Random, day: date, details: list) -> tuple:
+    """(공지 본문, 같은 항목으로 만든 업무 데이터)"""
+    items = [make_item(rng, day - timedelta(days=rng.randint(0, 20)), details) for _ in range(rng.randint(2, 6))]
+    systems = sorted({item[0] for item in items})
+    lines = [
+        f"제목: 정기 전산 업데이트({day.strftime('%Y.%m.%d')})",
+        "",
+        "■ 요약",
+        f"적용시스템: [{', '.join(systems)}]",
+        f"신규 업데이트: {len(items)}건",
+        "",
+        "■ 신규 업데이트",
+    ]
+    work_data = []
+    for system, menu, name, team, when in items:
+        lines += [
+            f"• {system}",
+            f"    ○ {name}({when})",
+            "        ▪ 대상",
+            f"            • {team}",
+            "        ▪ 경로",
+            f"            • {system} > {menu}",
+        ]
+        work_data += [f"- {system} {name} ~{when[5:].replace('.', '/')}", f"  - 대상: {team}"]
+    return "\n".join(lines), "\n".join(work_data)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="과거 공지 검색 지연 시간 벤치마크")
+    parser.add_argument("--notices", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/retrieval-<시각>-<커밋>.json)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    details = make_details(rng)
+    start_day = date(2020, 1, 1)
+    corpus = [make_notice(rng, start_day + timedelta(days=i % 2000), details) for i in range(args.notices)]
+
+    gc.collect()
+    rss_before = current_rss_kb()
+    index = NoticeIndex()
+    start = time.perf_counter()
+    for i, (content, _) in enumerate(corpus):
+        index.add(str(i), content)
+    build_s = time.perf_counter() - start
+    gc.collect()
+    rss_growth_kb = current_rss_kb() - rss_before
+
+    latencies = []
+    hits = 0
+    for _ in range(args.queries):
+        target = rng.randrange(args.notices)
+        start = time.perf_counter()
+        results = index.search(corpus[target][1], args.top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += any(notice_id == str(target) for notice_id, _ in results)
+
+    result = {
+        "notices": args.notices,
+        "top_k": args.top_k,
+        "build_s": round(build_s, 2),
+        "add_us_per_notice": round(build_s / args.notices * 1e6, 1),
+        "segments": len(index.segments),
+        "postings": sum(len(seg) for seg in index.segments),
+        "rss_growth_kb": rss_growth_kb,
+        "search_ms": summarize_ms(latencies),
+        "recall_at_k": round(hits / args.queries, 3),
+    }
+    print(
+        f"공지 {args.notices:,}건: 구축 {result['build_s']}s ({result['add_us_per_notice']}us/건), "
+        f"RSS +{rss_growth_kb / 1024:.1f}MB, 세그먼트 {result['segments']}개"
+    )
+    print(
+        f"검색 p50 {result['search_ms']['p50']:.2f}ms  p95 {result['search_ms']['p95']:.2f}ms  "
+        f"p99 {result['search_ms']['p99']:.2f}ms  recall@{args.top_k} {result['recall_at_k']:.3f}"
+    )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+        },
+        "result": result,
+    }
+    if args.output:
+        path = Path(args.output)
+    else:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = ROOT_DIR / "benchmarks" / "results" / f"retrieval-{stamp}-{report['meta']['git_commit'] or 'nogit'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+이전 공지의 '업데이트 예정' 항목 이월
+
+이전 공지의 '■ 업데이트 예정' 항목은 다음 공지의 '■ 업데이트 완료'가 됩니다
+(template_structure.json의 completed 설명 참고). 모델이 이 항목을 매번 다시 쓰지 않도록
+프롬프트에는 이월 항목 목록만 알려주고, 생성된 공지에 로컬에서 끼워 넣습니다.
+
+항목은 "기능명(날짜)" 형태의 ○ 줄 텍스트로 다룹니다.
+"""
+import re
+from typing import Dict, List, Optional
+
+COMPLETED_TITLE = "업데이트 완료"
+SCHEDULED_TITLE = "업데이트 예정"
+SUMMARY_TITLE = "요약"
+NOTICE_START = "### 생성된 공지 ###"
+NOTICE_END = "### 생성 완료 ###"
+
+SECTION_HEADER = re.compile(r"^■\s*(.+?)\s*$")
+SYSTEM_LINE = re.compile(r"^•\s*(.+?)\s*$")
+ITEM_LINE = re.compile(r"^\s+○\s*(.+?)\s*$")
+COMPLETED_COUNT = re.compile(r"^(\s*업데이트 완료\s*:\s*)\d+(\s*건)", re.MULTILINE)
+APPLIED_SYSTEMS = re.compile(r"^\s*적용시스템\s*:\s*\[?(.*?)\]?\s*$", re.MULTILINE)
+
+
+def item_name(item: str) -> str:
+    """중복 판단용 기능명 - 괄호(날짜) 앞부분"""
+    return item.split("(", 1)[0].strip()
+
+
+def system_of(line: str) -> Optional[str]:
+    """"• 시스템명" 줄이면 시스템명"""
+    match = SYSTEM_LINE.match(line)
+    return match.group(1).strip("[]") if match else None
+
+
+def find_section(lines: List[str], title: str) -> Optional[tuple]:
+    """(헤더 줄 번호, 섹션 끝 줄 번호) - 섹션 끝은 다음 ■ 헤더 또는 본문 끝"""
+    start = None
+    for i, line in enumerate(lines):
+        match = SECTION_HEADER.match(line)
+        if not match:
+            continue
+        if start is not None:
+            return start, i
+        if match.group(1) == title:
+            start = i
+    return (start, len(lines)) if start is not None else None
+
+
+def parse_system_items(content: str, title: str = SCHEDULED_TITLE) -> Dict[str, List[str]]:
+    """섹션의 시스템별 ○ 항목 텍스트 목록"""
+    lines = content.splitlines()
+    section = find_section(lines, title)
+    if section is None:
+        return {}
+    start, end = section
+    # 마지막 섹션 뒤의 맺음말("업데이트 관련 궁금하신 점이...")은 항목이 아니므로 ○ 줄만 사용
+    items: Dict[str, List[str]] = {}
+    system = None
+    for line in lines[start + 1:end]:
+        if system_of(line):
+            system = system_of(line)
+            continue
+        item_match = ITEM_LINE.match(line)
+        if item_match and system:
+            items.setdefault(system, []).append(item_match.group(1))
+    return items
+
+
+def parse_notice_systems(content: str) -> List[str]:
+    """공지에 실제로 나온 시스템 - 요약의 '적용시스템: [...]' 목록과 섹션의 '• 시스템' 줄"""
+    systems = []
+    match = APPLIED_SYSTEMS.search(content)
+    if match:
+        systems = [system.strip() for system in match.group(1).split(",") if system.strip()]
+    for line in content.splitlines():
+        system = system_of(line)
+        if system and system not in systems:
+            systems.append(system)
+    return systems
+
+
+def format_carried_items(carried: Dict[str, List[str]]) -> str:
+    lines = []
+    for system, items in carried.items():
+        lines.append(f"• {system}")
+        lines.extend(f"    ○ {item}" for item in items)
+    return "\n".join(lines)
+
+
+def build_prompt_section(carried: Dict[str, List[str]]) -> str:
+    """모델에 전달할 이월 항목 안내 (변경분만 작성하도록 요청)"""
+    if not carried:
+        return ""
+    return f"""
+## 이전 공지에서 이월된 항목 (시스템이 자동 포함)
+아래 항목은 이전 공지의 '업데이트 예정'에 있던 항목으로, 시스템이 '■ 업데이트 완료' 섹션에 자동으로 추가합니다.
+공지를 생성할 때 이 항목들은 다시 작성하지 말고, 사용자가 제공한 데이터 중 나머지 내용만 작성하세요.
+요약의 '업데이트 완료' 건수도 시스템이 다시 계산합니다.
+
+{format_carried_items(carried)}
+"""
+
+
+def splice_notice(notice_text: str, carried: Dict[str, List[str]]) -> str:
+    """공지 본문의 '■ 업데이트 완료' 섹션에 이월 항목을 추가하고 요약 건수 갱신"""
+    if not carried:
+        return notice_text
+    lines = notice_text.split("\n")
+    section = find_section(lines, COMPLETED_TITLE)
+    if section is None:
+        # 섹션이 없으면 요약 다음(없으면 첫 섹션 앞)에 새로 만듦
+        summary = find_section(lines, SUMMARY_TITLE)
+        insert_at = summary[1] if summary else next(
+            (i for i, line in enumerate(lines) if SECTION_HEADER.match(line)), len(lines)
+        )
+        lines[insert_at:insert_at] = [f"■ {COMPLETED_TITLE}", ""]
+        section = (insert_at, insert_at + 1)
+    start, end = section
+
+    body = lines[start + 1:end]
+    for system, items in carried.items():
+        system_index = next((i for i, line in enumerate(body) if system_of(line) == system), None)
+        if system_index is None:
+            # 섹션 끝의 빈 줄 앞에 새 시스템 블록 추가
+            insert_at = len(body)
+            while insert_at > 0 and not body[insert_at - 1].strip():
+                insert_at -= 1
+            body[insert_at:insert_at] = [f"• {system}"] + [f"    ○ {item}" for item in items]
+            continue
+
+        block_end = next((i for i in range(system_index + 1, len(body)) if system_of(body[i])), len(body))
+        existing = set()
+        for line in body[system_index + 1:block_end]:
+            match = ITEM_LINE.match(line)
+            if match:
+                existing.add(item_name(match.group(1)))
+        new_lines = [f"    ○ {item}" for item in items if item_name(item) not in existing]
+        body[system_index + 1:system_index + 1] = new_lines
+
+    lines[start + 1:end] = body
+    result = "\n".join(lines)
+
+    completed = parse_system_items(result, COMPLETED_TITLE)
+    total = sum(len(items) for items in completed.values())
+    return COMPLETED_COUNT.sub(lambda m: f"{m.group(1)}{total}{m.group(2)}", result, count=1)
+
+
+def splice_response(response: str, carried: Dict[str, List[str]]) -> str:
+    """AI 응답의 공지 마커 구간에만 이월 항목 반영"""
+    if not carried or NOTICE_START not in response or NOTICE_END not in response:
+        return response
+    start = response.find(NOTICE_START) + len(NOTICE_START)
+    end = response.find(NOTICE_END)
+    return response[:start] + splice_notice(response[start:end], carried) + response[end:]
+
+
+def detect_systems(texts: List[str], known_systems: List[str]) -> List[str]:
+    """대화 내용에 언급된 시스템"""
+    return [system for system in known_systems if any(system in text for text in texts)]
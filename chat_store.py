@@ -0,0 +1,167 @@
+"""
+채팅 세션 메시지 저장소
+
+- Message: __slots__ 기반 경량 메시지 (역할은 정수 enum, 시각은 epoch 밀리초 정수)
+- ChatHistory: 최근 메시지(hot)만 메모리에 두고, 오래된 메시지는 일정 개수씩 묶어
+  디스크(SQLite)의 cold 저장소로 내보냅니다. 프롬프트에는 최근 메시지만 사용되므로
+  cold 메시지는 기록 조회 시에만 읽습니다.
+"""
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+ROLE_USER = 0
+ROLE_ASSISTANT = 1
+ROLE_NAMES = ("user", "assistant")
+ROLE_IDS = {name: i for i, name in enumerate(ROLE_NAMES)}
+
+
+def now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def ms_to_iso(ts: int) -> str:
+    return datetime.fromtimestamp(ts / 1000).isoformat()
+
+
+class Message:
+    """채팅 메시지 1건"""
+
+    __slots__ = ("role_id", "content", "ts")
+
+    def __init__(self, role: str, content: str, ts: Optional[int] = None):
+        self.role_id = ROLE_IDS[role]
+        self.content = content
+        self.ts = now_ms() if ts is None else ts
+
+    @property
+    def role(self) -> str:
+        return ROLE_NAMES[self.role_id]
+
+    @property
+    def timestamp(self) -> str:
+        return ms_to_iso(self.ts)
+
+    def to_dict(self) -> dict:
+        """API 응답 형식 (기존 dict 메시지와 동일한 키)"""
+        return {"role": self.role, "content": self.content, "timestamp": self.timestamp}
+
+
+class ColdHistoryStore:
+    """hot 영역에서 밀려난 메시지를 보관하는 SQLite 저장소"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_messages ("
+            "session_id TEXT NOT NULL, seq INTEGER NOT NULL, role INTEGER NOT NULL, "
+            "content TEXT NOT NULL, ts INTEGER NOT NULL, PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+        )
+
+    def append(self, session_id: str, start_seq: int, messages: List[Message]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chat_messages (session_id, seq, role, content, ts) VALUES (?, ?, ?, ?, ?)",
+                [(session_id, start_seq + i, m.role_id, m.content, m.ts) for i, m in enumerate(messages)],
+            )
+
+    def read(self, session_id: str, start_seq: int, end_seq: int) -> List[Message]:
+        """[start_seq, end_seq) 구간 메시지"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content, ts FROM chat_messages "
+                "WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start_seq, end_seq),
+            ).fetchall()
+        return [Message(ROLE_NAMES[role], content, ts) for role, content, ts in rows]
+
+    def delete(self, session_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ChatHistory:
+    """세션 1개의 메시지 기록 (hot: 메모리, cold: ColdHistoryStore)
+
+    hot 메시지가 hot_limit + spill_batch 개를 넘으면 가장 오래된 spill_batch 개를
+    한 번에 cold 저장소로 옮깁니다 (spill_batch 기본값은 hot_limit).
+    cold_store가 없으면 전부 메모리에 둡니다.
+    """
+
+    __slots__ = ("session_id", "hot", "cold_count", "cold_store", "hot_limit", "spill_batch")
+
+    def __init__(self, session_id: str, cold_store: Optional[ColdHistoryStore] = None,
+                 hot_limit: int = 50, spill_batch: Optional[int] = None):
+        self.session_id = session_id
+        self.hot: List[Message] = []
+        self.cold_count = 0
+        self.cold_store = cold_store
+        self.hot_limit = hot_limit
+        self.spill_batch = spill_batch or hot_limit
+
+    @classmethod
+    def restore(cls, session_id: str, cold_store: Optional[ColdHistoryStore], hot_limit: int,
+                cold_count: int, hot: List[Message]) -> "ChatHistory":
+        """스냅샷에서 복원 (cold_count개는 이미 cold 저장소에 있음)"""
+        history = cls(session_id, cold_store, hot_limit)
+        history.cold_count = cold_count if cold_store is not None else 0
+        history.hot = hot
+        return history
+
+    def __len__(self) -> int:
+        return self.cold_count + len(self.hot)
+
+    def append(self, message: Message):
+        self.hot.append(message)
+        if self.cold_store is not None and len(self.hot) > self.hot_limit + self.spill_batch:
+            spilled = self.hot[:self.spill_batch]
+            self.cold_store.append(self.session_id, self.cold_count, spilled)
+            del self.hot[:self.spill_batch]
+            self.cold_count += len(spilled)
+
+    def recent(self, n: int) -> List[Message]:
+        """최근 n개 메시지 - hot 메시지가 모자라면 부족한 만큼 cold 저장소에서 읽음"""
+        missing = min(n - len(self.hot), self.cold_count)
+        if missing <= 0:
+            return self.hot[-n:] if n > 0 else []
+        cold = self.cold_store.read(self.session_id, self.cold_count - missing, self.cold_count)
+        return cold + self.hot
+
+    def snapshot(self) -> Tuple[int, List[Message]]:
+        """(cold 메시지 수, hot 메시지 복사본) - append/spill과 같은 스레드(이벤트 루프)에서 호출"""
+        return self.cold_count, list(self.hot)
+
+    def iter_pages(self, snapshot: Tuple[int, List[Message]], offset: int = 0, limit: Optional[int] = None,
+                   page_size: int = 200) -> Iterator[List[Message]]:
+        """snapshot 시점의 기록을 cold → hot 순서로 offset부터 limit개씩 page_size 단위로 반환
+
+        경계는 snapshot으로 고정되므로 다른 스레드에서 읽는 중에 spill이 일어나도 중복/누락이 없습니다
+        (cold 저장소의 snapshot 이전 구간은 바뀌지 않음).
+        """
+        cold_count, hot = snapshot
+        total = cold_count + len(hot)
+        end = total if limit is None else min(total, offset + limit)
+
+        pos = offset
+        while pos < min(end, cold_count):
+            page_end = min(pos + page_size, end, cold_count)
+            yield self.cold_store.read(self.session_id, pos, page_end)
+            pos = page_end
+        while pos < end:
+            page_end = min(pos + page_size, end)
+            yield hot[pos - cold_count:page_end - cold_count]
+            pos = page_end
+
+    def clear_cold(self):
+        if self.cold_store is not None and self.cold_count:
+            self.cold_store.delete(self.session_id)
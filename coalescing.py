@@ -0,0 +1,106 @@
+"""
+중복 요청 병합 (single-flight) 및 멱등성 키 저장소
+
+- SingleFlight: 같은 키로 동시에 들어온 요청은 먼저 들어온 요청의 실행 결과를 함께 기다립니다.
+- IdempotencyStore: Idempotency-Key 헤더로 들어온 요청의 성공 결과를 TTL 동안 보관하여
+  재시도 시 다시 실행하지 않고 저장된 결과를 돌려줍니다.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class IdempotencyKeyConflict(Exception):
+    """같은 멱등성 키로 내용이 다른 요청이 들어온 경우"""
+
+
+class SingleFlight:
+    """키별로 진행 중인 실행을 하나로 병합"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # 대기 중인 요청이 취소되어도 원래 실행은 계속되도록 shield
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.executed += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 대기자가 없을 때 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+
+class IdempotencyStore:
+    """멱등성 키별 성공 결과를 TTL/최대 개수 제한으로 보관 (LRU)"""
+
+    def __init__(self, ttl_seconds: float = 600, max_entries: int = 10000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (만료 시각, 요청 지문, 결과)
+        self._results: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._pending: Dict[Hashable, int] = {}
+        self._flights = SingleFlight()
+        self.replayed = 0
+
+    def _evict(self, now: float):
+        while self._results:
+            key, (expires_at, _, _) = next(iter(self._results.items()))
+            if expires_at > now and len(self._results) <= self.max_entries:
+                break
+            self._results.popitem(last=False)
+
+    async def run(self, key: Hashable, fingerprint: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """저장된 결과가 있으면 반환, 진행 중이면 함께 대기, 없으면 실행 후 저장
+
+        실패한 실행은 저장하지 않으므로 같은 키로 다시 시도할 수 있습니다.
+        """
+        now = time.monotonic()
+        self._evict(now)
+        digest = hash(fingerprint)
+
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[1] != digest:
+                raise IdempotencyKeyConflict(key)
+            self._results.move_to_end(key)
+            self.replayed += 1
+            return cached[2]
+
+        pending = self._pending.get(key)
+        if pending is not None and pending != digest:
+            raise IdempotencyKeyConflict(key)
+        if key in self._flights:
+            self.replayed += 1
+            return await self._flights.run(key, func)
+
+        self._pending[key] = digest
+        try:
+            result = await self._flights.run(key, func)
+        finally:
+            self._pending.pop(key, None)
+        self._results[key] = (time.monotonic() + self.ttl, digest, result)
+        self._evict(time.monotonic())
+        return result
@@ -0,0 +1,329 @@
+"""
+쓰기 지연(write-behind) 저널
+
+공지/채팅 변경 내역을 append-only 파일(JSON Lines)에 기록하여 재시작 후에도 복구합니다.
+백그라운드 태스크가 일정 시간(batch_ms) 또는 개수(batch_records)만큼 모아서 한 번에
+쓰고 fsync 하므로(group commit) 요청 처리 경로에서 fsync를 기다리지 않습니다.
+
+내구성 모드 (JOURNAL_MODE)
+- sync:    요청이 자신의 기록이 fsync 될 때까지 기다림 (동시 요청끼리는 같은 fsync 공유)
+- batched: 요청은 바로 반환, 최대 batch_ms 안에 fsync (장애 시 그 구간만 유실 가능)
+- off:     저널 사용 안 함 (기존처럼 메모리에만 보관)
+
+파일 구성
+- snapshot.jsonl:          압축 시점 상태 (첫 줄은 {"generation": N})
+- journal-<generation>.log: snapshot 이후 변경 기록, generation N 이상만 재생
+
+기록 재생은 멱등이어야 합니다 (스냅샷 작성 중 들어온 기록이 스냅샷과 저널 양쪽에 있을 수 있음).
+"""
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+MODES = ("sync", "batched", "off")
+SNAPSHOT_FILE = "snapshot.jsonl"
+FLUSH_RETRY_INTERVAL = 1.0  # 기록 실패 후 새 기록이 없어도 다시 시도하기까지 대기 시간(초)
+COMPACT_RETRY_INTERVAL = 60.0  # 압축 실패 후 다시 시도하기까지 대기 시간(초)
+
+
+class Journal:
+    """group commit 방식의 append-only 저널"""
+
+    def __init__(
+        self,
+        directory: str,
+        mode: str = "batched",
+        batch_ms: float = 10.0,
+        batch_records: int = 256,
+        compact_bytes: int = 64 * 1024 * 1024,
+        compact_interval: float = 3600.0,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"JOURNAL_MODE는 {', '.join(MODES)} 중 하나여야 합니다: {mode}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.batch_interval = batch_ms / 1000
+        self.batch_records = batch_records
+        self.compact_bytes = compact_bytes
+        self.compact_interval = compact_interval
+
+        self.generation = 0
+        self.journal_bytes = 0
+        self.last_compacted = time.monotonic()
+        self._compact_after = 0.0
+        self.stats = {"records": 0, "flushes": 0, "compactions": 0,
+                      "flush_errors": 0, "compact_errors": 0, "replayed": 0}
+
+        self._pending: List[Tuple[bytes, Optional[asyncio.Future]]] = []
+        self._file = None
+        self._torn = False  # 현재 파일에 기록 도중 실패한 줄이 남아 있을 수 있음
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._snapshot_fn: Optional[Callable[[], Iterable[dict]]] = None
+
+    @classmethod
+    def from_env(cls) -> "Journal":
+        return cls(
+            directory=os.getenv("JOURNAL_DIR", "data"),
+            mode=os.getenv("JOURNAL_MODE", "batched").strip().lower(),
+            batch_ms=float(os.getenv("JOURNAL_BATCH_MS", 10)),
+            batch_records=int(os.getenv("JOURNAL_BATCH_RECORDS", 256)),
+            compact_bytes=int(os.getenv("JOURNAL_COMPACT_BYTES", 64 * 1024 * 1024)),
+            compact_interval=float(os.getenv("JOURNAL_COMPACT_INTERVAL_S", 3600)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    # ==================== 시작/종료 ====================
+
+    async def start(self, apply: Callable[[dict], None], snapshot: Callable[[], Iterable[dict]]):
+        """스냅샷과 저널을 재생(apply)한 뒤 새 세대 저널을 열고 flush 태스크 시작
+
+        snapshot은 현재 상태를 기록 목록으로 돌려주는 함수이며 압축 시 사용됩니다.
+        """
+        if not self.enabled:
+            return
+        self._snapshot_fn = snapshot
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        records, generation, journal_records = await asyncio.to_thread(self._load)
+        for record in records:
+            apply(record)
+        self.stats["replayed"] = len(records)
+
+        self._wakeup = asyncio.Event()
+        self.generation = generation
+        await self._rotate()
+        # 재생한 저널 기록이 있으면 바로 압축하여 다음 시작 시간을 줄임
+        if journal_records:
+            await self._compact()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """남은 기록을 flush 하고 파일 닫기"""
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._file is not None:
+            await self._flush()
+            if self._pending:
+                print(f"기록하지 못한 저널 기록: {len(self._pending)}건")
+            await self._close(self._file)
+            self._file = None
+
+    # ==================== 기록 ====================
+
+    async def append(self, op: str, **data):
+        """변경 기록 추가 - sync 모드에서는 fsync 완료까지 대기"""
+        if not self.enabled or self._wakeup is None:
+            return
+        if self._task is not None and self._task.done():
+            raise RuntimeError("저널 flush 태스크가 종료되어 기록할 수 없습니다")
+        line = json.dumps({"op": op, **data}, ensure_ascii=False).encode("utf-8") + b"\n"
+        future = asyncio.get_running_loop().create_future() if self.mode == "sync" else None
+        self._pending.append((line, future))
+        self.stats["records"] += 1
+
+        if self.mode == "sync" or len(self._pending) == 1 or len(self._pending) >= self.batch_records:
+            self._wakeup.set()
+        if future is not None:
+            await future
+
+    async def _run(self):
+        try:
+            while True:
+                if self._pending and not self._wakeup.is_set():
+                    # 이전 flush가 실패해 남은 기록 - 새 기록이 없어도 잠시 후 다시 시도
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), FLUSH_RETRY_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await self._wakeup.wait()
+                if self.mode == "batched" and not self._closing and len(self._pending) < self.batch_records:
+                    # 첫 기록 이후 batch_ms 동안(또는 batch_records개가 찰 때까지) 모음
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.batch_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                self._wakeup.clear()
+                await self._flush()
+                if self._closing:
+                    return
+                if self._should_compact():
+                    try:
+                        await self._compact()
+                    except Exception as e:
+                        # 압축은 다음 기회에 다시 시도하고 기록은 계속 받음 (실패해도 저널만으로 복구 가능)
+                        self._compact_after = time.monotonic() + COMPACT_RETRY_INTERVAL
+                        self.stats["compact_errors"] += 1
+                        print(f"저널 압축 오류 (나중에 다시 시도): {e}")
+        finally:
+            # 예기치 않게 종료되면 기록 완료를 기다리는 요청이 멈추지 않도록 실패 처리
+            self._fail_waiters(RuntimeError("저널 flush 태스크가 종료되었습니다"))
+
+    def _should_compact(self) -> bool:
+        if not self.journal_bytes or time.monotonic() < self._compact_after:
+            return False
+        return (
+            self.journal_bytes >= self.compact_bytes
+            or time.monotonic() - self.last_compacted >= self.compact_interval
+        )
+
+    def _fail_waiters(self, error: Exception):
+        """대기 중인 요청에는 오류를 알리고, 기록 자체는 남겨 둠 (stop의 마지막 flush에서 기록)"""
+        for i, (line, future) in enumerate(self._pending):
+            if future is not None:
+                if not future.done():
+                    future.set_exception(error)
+                self._pending[i] = (line, None)
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        data = b"".join(line for line, _ in batch)
+        try:
+            if self._torn:
+                # 일부만 기록된 줄 뒤에 이어 쓰면 재생 시 그 뒤의 기록을 모두 잃으므로 새 세대 파일로 전환
+                await self._rotate()
+            await asyncio.to_thread(self._write, self._file, data)
+        except Exception as e:
+            self._torn = True
+            self.stats["flush_errors"] += 1
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            # 기록은 버리지 않고 다음 flush에서 다시 기록 (일부 중복 기록되어도 재생은 멱등)
+            self._pending[:0] = [(line, None) for line, _ in batch]
+            print(f"저널 기록 오류 (다음 flush에서 다시 시도): {e}")
+            return
+        self.journal_bytes += len(data)
+        self.stats["flushes"] += 1
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    @staticmethod
+    def _write(file, data: bytes):
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+    # ==================== 압축/재생 ====================
+
+    def _journal_path(self, generation: int) -> Path:
+        return self.directory / f"journal-{generation:08d}.log"
+
+    async def _rotate(self):
+        """다음 세대 저널 파일로 전환 (이후 기록은 새 파일에 기록)"""
+        old = self._file
+        generation = self.generation + 1
+        self._file = await asyncio.to_thread(open, self._journal_path(generation), "ab")
+        self.generation = generation
+        self.journal_bytes = 0
+        self._torn = False
+        if old is not None:
+            await self._close(old)
+
+    @staticmethod
+    async def _close(file):
+        try:
+            await asyncio.to_thread(file.close)
+        except OSError as e:
+            # 기록에 실패했던 파일은 닫을 때 남은 버퍼를 쓰다가 다시 실패할 수 있음 (기록은 새 파일에 다시 씀)
+            print(f"이전 저널 파일 닫기 오류: {e}")
+
+    async def _compact(self):
+        """현재 상태를 스냅샷으로 저장하고 이전 세대 저널 삭제"""
+        await self._flush()
+        # 상태 복사와 세대 전환 사이에 await가 없어야 이후 기록이 모두 새 세대로 감
+        records = list(self._snapshot_fn())
+        old = self._file
+        generation = self.generation + 1
+        self._file = open(self._journal_path(generation), "ab")
+        self.generation = generation
+        self.journal_bytes = 0
+        self._torn = False
+
+        await self._close(old)
+        await asyncio.to_thread(self._write_snapshot, records, generation)
+        self.last_compacted = time.monotonic()
+        self.stats["compactions"] += 1
+
+    def _write_snapshot(self, records: List[dict], generation: int):
+        tmp_path = self.directory / (SNAPSHOT_FILE + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps({"generation": generation}).encode("utf-8") + b"\n")
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.directory / SNAPSHOT_FILE)
+        self._fsync_directory()
+
+        for path in self.directory.glob("journal-*.log"):
+            if _generation_of(path) < generation:
+                path.unlink()
+
+    def _fsync_directory(self):
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return  # Windows 등 디렉터리 fsync 미지원
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _load(self) -> Tuple[List[dict], int, int]:
+        """(재생할 기록, 마지막 세대 번호, 그중 저널 파일에서 읽은 기록 수) 반환"""
+        records = []
+        generation = 0
+        snapshot_path = self.directory / SNAPSHOT_FILE
+        if snapshot_path.exists():
+            lines = _read_lines(snapshot_path)
+            if lines:
+                generation = lines[0].get("generation", 0)
+                records.extend(lines[1:])
+
+        journal_files = sorted(
+            (p for p in self.directory.glob("journal-*.log") if _generation_of(p) >= generation),
+            key=_generation_of,
+        )
+        snapshot_count = len(records)
+        for path in journal_files:
+            lines = _read_lines(path)
+            if not lines:
+                # 기록 없이 끝난 세대 (재시작 직후 종료 등) - 이후 새 세대를 열기 전에 정리
+                path.unlink()
+            records.extend(lines)
+        if journal_files:
+            generation = max(generation, _generation_of(journal_files[-1]))
+        return records, generation, len(records) - snapshot_count
+
+
+def _generation_of(path: Path) -> int:
+    return int(path.stem.split("-", 1)[1])
+
+
+def _read_lines(path: Path) -> List[dict]:
+    """JSON Lines 읽기 - 마지막 줄이 기록 도중 끊긴 경우 그 앞까지만 사용"""
+    records = []
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                print(f"저널 손상 구간 무시: {path}")
+                break
+    return records
@@ -0,0 +1,212 @@
+"""
+이벤트 루프 지연 모니터 / 느린 핸들러 프로파일링
+
+- 루프 안의 하트비트 태스크가 주기적으로 sleep 하며 지연(lag)을 측정합니다.
+- 별도 감시 스레드가 하트비트가 threshold 이상 멈추면 루프 스레드의 스택을
+  주기적으로 샘플링하고, 당시 실행 중이던 요청(메서드/경로)을 함께 기록합니다.
+- 기록은 링 버퍼(deque)에 쌓이며 디버그 엔드포인트에서 조회합니다.
+
+LOOP_MONITOR_ENABLED가 꺼져 있으면 미들웨어/태스크/스레드를 전혀 만들지 않습니다.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, Optional
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class LoopMonitor:
+    """이벤트 루프 지연 측정 및 루프를 오래 점유한 요청의 스택 샘플 수집"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        threshold_ms: float = 100.0,
+        interval_ms: float = 10.0,
+        sample_interval_ms: float = 5.0,
+        buffer_size: int = 100,
+        max_stack_depth: int = 30,
+    ):
+        self.enabled = enabled
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.sample_interval = sample_interval_ms / 1000
+        self.max_stack_depth = max_stack_depth
+
+        self.events = deque(maxlen=buffer_size)
+        self.recent_lags_ms = deque(maxlen=1000)
+        self.max_lag_ms = 0.0
+        self.total_ticks = 0
+        self.slow_ticks = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # 요청을 처리 중인 태스크 -> 요청 정보 (감시 스레드가 루프 점유 요청을 식별하는 데 사용)
+        self._requests_by_task: Dict[asyncio.Task, dict] = {}
+
+    @classmethod
+    def from_env(cls) -> "LoopMonitor":
+        return cls(
+            enabled=_env_flag("LOOP_MONITOR_ENABLED"),
+            threshold_ms=float(os.getenv("LOOP_MONITOR_THRESHOLD_MS", 100)),
+            interval_ms=float(os.getenv("LOOP_MONITOR_INTERVAL_MS", 10)),
+            sample_interval_ms=float(os.getenv("LOOP_MONITOR_SAMPLE_MS", 5)),
+            buffer_size=int(os.getenv("LOOP_MONITOR_BUFFER", 100)),
+        )
+
+    # ==================== 시작/종료 ====================
+
+    async def start(self):
+        """앱 startup 시 호출 - 하트비트 태스크와 감시 스레드 시작"""
+        if not self.enabled or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat_loop())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        """앱 shutdown 시 호출"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    # ==================== 루프 지연 측정 ====================
+
+    async def _heartbeat_loop(self):
+        while True:
+            before = time.monotonic()
+            self._heartbeat = before
+            await asyncio.sleep(self.interval)
+            lag_ms = max(time.monotonic() - before - self.interval, 0.0) * 1000
+            self.recent_lags_ms.append(lag_ms)
+            self.total_ticks += 1
+            if lag_ms > self.max_lag_ms:
+                self.max_lag_ms = lag_ms
+            if lag_ms >= self.threshold * 1000:
+                self.slow_ticks += 1
+
+    def _watch(self):
+        """감시 스레드 - 하트비트가 멈추면 루프 스레드 스택을 샘플링"""
+        while not self._stop.is_set():
+            stalled_since = self._heartbeat
+            if time.monotonic() - stalled_since < self.interval + self.threshold:
+                self._stop.wait(self.sample_interval)
+                continue
+
+            request = self._current_request()
+            stacks = Counter()
+            samples = 0
+            while self._heartbeat == stalled_since and not self._stop.is_set():
+                stack = self._sample_stack()
+                if stack:
+                    stacks[stack] += 1
+                    samples += 1
+                self._stop.wait(self.sample_interval)
+
+            blocked_ms = (time.monotonic() - stalled_since - self.interval) * 1000
+            self.events.append({
+                "detected_at": datetime.now().isoformat(),
+                "blocked_ms": round(max(blocked_ms, 0.0), 1),
+                "request": request,
+                "samples": samples,
+                "stacks": [
+                    {"count": count, "stack": list(stack)}
+                    for stack, count in stacks.most_common(5)
+                ],
+            })
+
+    def _sample_stack(self) -> tuple:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return ()
+        summary = traceback.extract_stack(frame, limit=self.max_stack_depth)
+        return tuple(f"{f.filename}:{f.lineno} {f.name}" for f in summary)
+
+    def _current_request(self) -> Optional[dict]:
+        """루프 스레드에서 현재 실행 중인 태스크가 처리하는 요청 정보"""
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return None
+        info = self._requests_by_task.get(task)
+        if info is None:
+            return None
+        return {
+            "method": info["method"],
+            "path": info["path"],
+            "elapsed_ms": round((time.monotonic() - info["started"]) * 1000, 1),
+        }
+
+    # ==================== 조회 ====================
+
+    def snapshot(self) -> dict:
+        """디버그 엔드포인트 응답"""
+        lags = sorted(self.recent_lags_ms)
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": {
+                "recent_count": len(lags),
+                "p50": round(lags[len(lags) // 2], 3) if lags else 0.0,
+                "p99": round(lags[min(int(len(lags) * 0.99), len(lags) - 1)], 3) if lags else 0.0,
+                "max": round(self.max_lag_ms, 3),
+            },
+            "ticks": {"total": self.total_ticks, "slow": self.slow_ticks},
+            "in_flight": len(self._requests_by_task),
+            "slow_events": list(self.events),
+        }
+
+
+class LoopMonitorMiddleware:
+    """요청을 처리하는 태스크와 요청 정보를 연결하는 ASGI 미들웨어
+
+    BaseHTTPMiddleware와 달리 별도 태스크를 만들지 않으므로 서버가 요청마다
+    만든 태스크가 그대로 핸들러를 실행합니다.
+    """
+
+    def __init__(self, app, monitor: LoopMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        self.monitor._requests_by_task[task] = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "started": time.monotonic(),
+        }
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor._requests_by_task.pop(task, None)
@@ -1,16 +1,31 @@
-from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Request, Form, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import google.generativeai as genai
 from dotenv import load_dotenv
 import os
 import json
+import math
+import re
 from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel
 import uuid
 
+from carry_forward import (
+    build_prompt_section, detect_systems, parse_notice_systems, parse_system_items, splice_response
+)
+from chat_store import ROLE_NAMES, ChatHistory, ColdHistoryStore, Message
+from coalescing import IdempotencyKeyConflict, IdempotencyStore, SingleFlight
+from journal import Journal
+from loop_monitor import LoopMonitor, LoopMonitorMiddleware
+from model_router import ModelRouter, estimate_tokens, looks_like_work_data
+from rate_limit import RateLimiter
+from retrieval import NoticeIndex, build_examples_section
+from tasks import HIGH, LOW, PermanentTaskError, TaskScheduler
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -21,17 +36,56 @@ app = FastAPI(title="AI 전산 공지 생성기")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# 이벤트 루프 지연 모니터 (LOOP_MONITOR_ENABLED=1 일 때만 동작)
+loop_monitor = LoopMonitor.from_env()
+if loop_monitor.enabled:
+    app.add_middleware(LoopMonitorMiddleware, monitor=loop_monitor)
+
 # Gemini API 설정
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY가 .env 파일에 설정되지 않았습니다.")
 
 genai.configure(api_key=GEMINI_API_KEY)
-#model = genai.GenerativeModel('gemini-2.5-flash-lite')
-model = genai.GenerativeModel('gemini-flash-latest')
+# 간단한 질의응답은 빠른 모델, 공지 생성/수정은 강한 모델 (GEMINI_FAST_MODEL / GEMINI_STRONG_MODEL)
+model_router = ModelRouter.from_env(genai.GenerativeModel)
 # 데이터 저장소 (실제 운영시에는 DB 사용 권장)
 notices_db = []
 chat_sessions = {}
+# 세션별 최근 메시지는 메모리, 오래된 메시지는 디스크(cold) 저장소에 보관
+# (CHAT_COLD_STORE_PATH를 빈 값으로 두면 전부 메모리에 보관)
+CHAT_COLD_STORE_PATH = os.getenv("CHAT_COLD_STORE_PATH", "chat_history.db")
+# 프롬프트/라우팅에 쓰는 최근 메시지 수 - hot 메시지는 최소 이만큼 두어 매 요청 디스크를 읽지 않도록 함
+CHAT_PROMPT_WINDOW = 20
+CHAT_HOT_MESSAGES = max(int(os.getenv("CHAT_HOT_MESSAGES", 50)), CHAT_PROMPT_WINDOW)
+cold_history_store = ColdHistoryStore(CHAT_COLD_STORE_PATH) if CHAT_COLD_STORE_PATH else None
+# 공지 목록용 경량 요약 (id -> 본문 제외 필드), 공지 저장 시점에 갱신
+notice_summaries = {}
+# id -> 공지
+notices_by_id = {}
+# 공지 id -> 시스템별 '업데이트 예정' 항목, 시스템 -> 가장 최근 공지 id (다음 공지로 이월할 항목 조회용)
+scheduled_items_by_notice = {}
+latest_notice_by_system = {}
+# 공지 id -> 공지를 생성한 채팅 세션 id (같은 대화의 공지는 이월하지 않음, 세션 id는 API 응답에 노출하지 않음)
+notice_sessions = {}
+CARRY_FORWARD_ENABLED = os.getenv("CARRY_FORWARD_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+# 비슷한 과거 공지 검색용 색인 (공지 생성 시 형식 예시로 전달, RETRIEVAL_TOP_K=0이면 사용 안 함)
+notice_index = NoticeIndex()
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 2))
+RETRIEVAL_CONTEXT_CHARS = int(os.getenv("RETRIEVAL_CONTEXT_CHARS", 3000))
+RETRIEVAL_MIN_SCORE = float(os.getenv("RETRIEVAL_MIN_SCORE", 0.1))
+
+# 변경 내역 저널 (재시작 시 복구, JOURNAL_MODE=sync|batched|off)
+journal = Journal.from_env()
+# 응답 후 처리할 작업(생성된 공지 저장, 색인 등)의 백그라운드 워커 풀
+task_scheduler = TaskScheduler.from_env()
+
+# 같은 세션의 동일 메시지 동시 요청 병합 / Idempotency-Key 재시도 결과 보관
+chat_flights = SingleFlight()
+idempotency_store = IdempotencyStore(ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 600)))
+
+# 세션/IP/전체 요청 수 및 업스트림 토큰 예산 제한 (RATE_LIMIT_* 환경 변수)
+rate_limiter = RateLimiter.from_env()
 
 # 템플릿 구조 로드
 def load_template_structure():
@@ -42,6 +96,7 @@ template_structure = load_template_structure()
 
 
 # Pydantic 모델
+# API 응답 형식 (내부 저장은 chat_store.Message)
 class ChatMessage(BaseModel):
     role: str  # 'user' or 'assistant'
     content: str
@@ -55,6 +110,8 @@ class Notice(BaseModel):
     updated_at: str
     systems: List[str]
     date: str
+    preview: str = ""
+    summary_counts: dict = {}
 
 class NoticeCreate(BaseModel):
     title: str
@@ -69,6 +126,21 @@ class NoticeUpdate(BaseModel):
     date: Optional[str] = None
 
 
+@app.on_event("startup")
+async def startup():
+    await loop_monitor.start()
+    await journal.start(apply_journal_record, snapshot_records)
+    await task_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    # 남은 작업이 저널에 기록할 수 있도록 저널보다 먼저 종료
+    await task_scheduler.stop()
+    await journal.stop()
+    await loop_monitor.stop()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """메인 페이지 - 채팅 인터페이스"""
@@ -94,117 +166,217 @@ async def notices_page(request: Request):
 # ==================== 채팅 API ====================
 
 @app.post("/api/chat")
-async def chat(message: str = Form(...), session_id: str = Form(...)):
-    """채팅 메시지 처리"""
+async def chat(
+    request: Request,
+    message: str = Form(...),
+    session_id: str = Form(...),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """채팅 메시지 처리 (같은 세션의 동일 메시지 동시 요청은 한 번만 생성)"""
+    client_ip = request.client.host if request.client else "unknown"
+    
+    async def execute():
+        # 요청 제한은 실제로 실행할 때만 차감 (같은 Idempotency-Key 재시도나
+        # 동시에 들어온 같은 요청은 실행 중이거나 저장된 결과를 함께 받으므로 차감하지 않음)
+        raise_if_limited(
+            await check_rate_limit(rate_limiter.check_request, session_id, client_ip),
+            "요청이 너무 많습니다. 잠시 후 다시 시도해주세요."
+        )
+        return await process_chat_message(message, session_id)
+
+    async def generate():
+        return await chat_flights.run((session_id, message), execute)
+
     try:
-        # 세션 초기화
-        if session_id not in chat_sessions:
-            chat_sessions[session_id] = {
-                "messages": [],
-                "context": create_system_prompt()
-            }
-        
-        session = chat_sessions[session_id]
-        
-        # 사용자 메시지 저장
-        user_message = {
-            "role": "user",
-            "content": message,
-            "timestamp": datetime.now().isoformat()
-        }
-        session["messages"].append(user_message)
-        
-        # Gemini API 호출
-        chat_history = build_chat_history(session["messages"])
-        full_prompt = f"{session['context']}\n\n대화 기록:\n{chat_history}\n\n사용자: {message}\n\nAI:"
-        
-        response = model.generate_content(full_prompt)
-        ai_response = response.text
-        
-        # AI 응답 저장
-        assistant_message = {
-            "role": "assistant",
-            "content": ai_response,
-            "timestamp": datetime.now().isoformat()
-        }
-        session["messages"].append(assistant_message)
-        
-        # 공지 생성 감지
-        notice_data = extract_notice_from_response(ai_response)
-        
-        return JSONResponse(content={
-            "success": True,
-            "message": ai_response,
-            "notice_generated": notice_data is not None,
-            "notice": notice_data
-        })
+        result = await run_idempotent("chat", idempotency_key, (session_id, message), generate)
+        return JSONResponse(content=result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"채팅 처리 중 오류: {str(e)}")
 
 
+async def process_chat_message(message: str, session_id: str) -> dict:
+    """사용자 메시지 저장 → 모델 호출 → 응답 저장 및 공지 추출"""
+    session = get_or_create_session(session_id)
+    
+    user_message = Message("user", message)
+    recent_messages = session["messages"].recent(CHAT_PROMPT_WINDOW) + [user_message]
+    tier = model_router.route(message, recent_messages)
+    # 모델 티어가 아닌 대화 단계 기준 (업무 데이터가 있고 아직 공지를 생성하지 않은 턴)
+    generation_turn = model_router.is_generation_turn(message, recent_messages)
+    
+    # 공지 생성 턴이면 이전 공지의 '업데이트 예정' 항목을 이월 (모델은 나머지만 작성)
+    carried = {}
+    if CARRY_FORWARD_ENABLED and generation_turn:
+        carried = collect_carried_items(
+            [m.content for m in recent_messages if m.role == "user"], session_id, datetime.now().strftime("%Y-%m-%d")
+        )
+    
+    # 공지 생성 턴이면 업무 데이터와 비슷한 과거 공지를 형식 예시로 전달 (형식 확인 왕복 감소)
+    examples = ""
+    if RETRIEVAL_TOP_K > 0 and generation_turn:
+        examples = build_examples_section(find_similar_notices(recent_messages), RETRIEVAL_CONTEXT_CHARS)
+    
+    chat_history = build_chat_history(recent_messages)
+    full_prompt = f"{session['context']}{examples}{build_prompt_section(carried)}\n\n대화 기록:\n{chat_history}\n\n사용자: {message}\n\nAI:"
+    
+    # 업스트림 토큰 예산 확인 (거절 시 대화 기록에 남기지 않음)
+    raise_if_limited(
+        await check_rate_limit(rate_limiter.check_tokens, estimate_tokens(full_prompt)),
+        "AI 사용량 한도를 초과했습니다. 잠시 후 다시 시도해주세요."
+    )
+    
+    # 사용자 메시지 저장
+    await append_chat_message(session_id, session["messages"], user_message)
+    
+    # Gemini API 호출 (동기 호출이므로 스레드풀에서 실행해 이벤트 루프를 막지 않음)
+    ai_response = await run_in_threadpool(model_router.generate, full_prompt, tier)
+    ai_response = splice_response(ai_response, carried)
+    
+    # AI 응답 저장
+    await append_chat_message(session_id, session["messages"], Message("assistant", ai_response))
+    
+    # 공지 생성 감지 - 추출/저장/색인은 백그라운드에서 처리하고 응답은 바로 반환
+    # (진행 상태는 GET /api/notices/{notice_id}/tasks로 조회)
+    notice_id = None
+    if contains_notice(ai_response):
+        notice_id = str(uuid.uuid4())
+        await task_scheduler.submit(
+            "store", store_generated_notice, ai_response, notice_id, session_id, key=notice_id, priority=HIGH
+        )
+    
+    return {
+        "success": True,
+        "message": ai_response,
+        "notice_generated": notice_id is not None,
+        "notice_id": notice_id
+    }
+
+
 @app.get("/api/chat/history/{session_id}")
-async def get_chat_history(session_id: str):
-    """채팅 기록 조회"""
+async def get_chat_history(session_id: str, offset: int = 0, limit: Optional[int] = None):
+    """채팅 기록 조회 - 디스크/메모리 기록을 페이지 단위로 스트리밍"""
     if session_id not in chat_sessions:
-        return JSONResponse(content={"messages": []})
+        return JSONResponse(content={"messages": [], "total": 0})
+    
+    history = chat_sessions[session_id]["messages"]
+    # StreamingResponse는 동기 generator를 스레드풀에서 실행하므로 경계는 여기(이벤트 루프)에서 고정
+    snapshot = history.snapshot()
+    total = snapshot[0] + len(snapshot[1])
+    
+    def stream():
+        yield '{"total": %d, "messages": [' % total
+        first = True
+        for page in history.iter_pages(snapshot, max(offset, 0), limit):
+            for msg in page:
+                yield ("" if first else ",") + json.dumps(msg.to_dict(), ensure_ascii=False)
+                first = False
+        yield "]}"
     
-    return JSONResponse(content={"messages": chat_sessions[session_id]["messages"]})
+    return StreamingResponse(stream(), media_type="application/json")
 
 
 @app.delete("/api/chat/session/{session_id}")
 async def clear_chat(session_id: str):
     """채팅 세션 초기화"""
     if session_id in chat_sessions:
-        del chat_sessions[session_id]
+        remove_session(session_id)
+        await journal.append("chat_clear", session_id=session_id)
     return JSONResponse(content={"success": True, "message": "채팅이 초기화되었습니다."})
 
 
 # ==================== 공지 CRUD API ====================
 
+# 목록 API 기본 응답 필드 (본문 content는 상세 조회에서만 제공)
+NOTICE_SUMMARY_FIELDS = ["id", "title", "date", "systems", "preview", "summary_counts", "created_at", "updated_at"]
+NOTICE_FIELDS = NOTICE_SUMMARY_FIELDS + ["content"]
+
+
 @app.get("/api/notices")
-async def get_notices():
-    """모든 공지 조회"""
-    return JSONResponse(content={"notices": notices_db})
+async def get_notices(fields: Optional[str] = None, q: Optional[str] = None):
+    """공지 목록 조회 - 기본은 본문 제외 요약, fields=title,date,... 로 필드 선택
+
+    q가 있으면 제목/본문 전체에서 대소문자 구분 없이 검색합니다 (본문은 응답에 포함하지 않음).
+    """
+    notices = notices_db
+    if q and q.strip():
+        pattern = re.compile(re.escape(q.strip()), re.IGNORECASE)
+        notices = [n for n in notices_db if pattern.search(n["title"]) or pattern.search(n["content"])]
+    
+    if not fields:
+        if notices is notices_db:
+            return JSONResponse(content={"notices": list(notice_summaries.values())})
+        return JSONResponse(content={"notices": [notice_summaries[n["id"]] for n in notices]})
+    
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in NOTICE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 필드: {', '.join(unknown)}")
+    if "id" not in requested:
+        requested.insert(0, "id")
+    
+    return JSONResponse(content={"notices": [{f: n[f] for f in requested} for n in notices]})
 
 
 @app.get("/api/notices/{notice_id}")
 async def get_notice(notice_id: str):
     """특정 공지 조회"""
-    notice = next((n for n in notices_db if n["id"] == notice_id), None)
+    notice = notices_by_id.get(notice_id)
     if not notice:
         raise HTTPException(status_code=404, detail="공지를 찾을 수 없습니다.")
     return JSONResponse(content=notice)
 
 
+@app.get("/api/notices/{notice_id}/tasks")
+async def get_notice_tasks(notice_id: str):
+    """공지의 백그라운드 작업(저장, 색인) 상태 조회"""
+    tasks = task_scheduler.status(notice_id)
+    if tasks is None and notice_id not in notices_by_id:
+        raise HTTPException(status_code=404, detail="공지를 찾을 수 없습니다.")
+    return JSONResponse(content={
+        "notice_id": notice_id,
+        "stored": notice_id in notices_by_id,
+        "tasks": tasks or {}
+    })
+
+
 @app.post("/api/notices")
 async def create_notice(
     title: str = Form(...),
     content: str = Form(...),
     systems: str = Form(...),
-    date: str = Form(...)
+    date: str = Form(...),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """새 공지 생성"""
-    notice_id = str(uuid.uuid4())
-    now = datetime.now().isoformat()
-    
-    notice = {
-        "id": notice_id,
-        "title": title,
-        "content": content,
-        "systems": systems.split(",") if isinstance(systems, str) else systems,
-        "date": date,
-        "created_at": now,
-        "updated_at": now
-    }
-    
-    notices_db.append(notice)
+    async def create():
+        notice_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        
+        notice = {
+            "id": notice_id,
+            "title": title,
+            "content": content,
+            "systems": systems.split(",") if isinstance(systems, str) else systems,
+            "date": date,
+            "created_at": now,
+            "updated_at": now
+        }
+        
+        save_notice(notice)
+        await journal.append("notice_put", notice=notice)
+        await schedule_notice_indexing(notice_id)
+        
+        return {
+            "success": True,
+            "message": "공지가 생성되었습니다.",
+            "notice": notice
+        }
     
-    return JSONResponse(content={
-        "success": True,
-        "message": "공지가 생성되었습니다.",
-        "notice": notice
-    })
+    result = await run_idempotent("notices", idempotency_key, (title, content, systems, date), create)
+    return JSONResponse(content=result)
 
 
 @app.put("/api/notices/{notice_id}")
@@ -216,7 +388,7 @@ async def update_notice(
     date: Optional[str] = Form(None)
 ):
     """공지 수정"""
-    notice = next((n for n in notices_db if n["id"] == notice_id), None)
+    notice = notices_by_id.get(notice_id)
     if not notice:
         raise HTTPException(status_code=404, detail="공지를 찾을 수 없습니다.")
     
@@ -230,6 +402,9 @@ async def update_notice(
         notice["date"] = date
     
     notice["updated_at"] = datetime.now().isoformat()
+    index_notice(notice)
+    await journal.append("notice_put", notice=notice)
+    await schedule_notice_indexing(notice_id)
     
     return JSONResponse(content={
         "success": True,
@@ -241,12 +416,11 @@ async def update_notice(
 @app.delete("/api/notices/{notice_id}")
 async def delete_notice(notice_id: str):
     """공지 삭제"""
-    global notices_db
-    notice = next((n for n in notices_db if n["id"] == notice_id), None)
-    if not notice:
+    if notice_id not in notices_by_id:
         raise HTTPException(status_code=404, detail="공지를 찾을 수 없습니다.")
     
-    notices_db = [n for n in notices_db if n["id"] != notice_id]
+    remove_notice(notice_id)
+    await journal.append("notice_delete", id=notice_id)
     
     return JSONResponse(content={
         "success": True,
@@ -256,6 +430,274 @@ async def delete_notice(notice_id: str):
 
 # ==================== 헬퍼 함수 ====================
 
+async def check_rate_limit(check, *args) -> float:
+    """SQLite 백엔드는 다른 워커의 잠금을 기다릴 수 있으므로 스레드풀에서 확인"""
+    if rate_limiter.blocking:
+        return await run_in_threadpool(check, *args)
+    return check(*args)
+
+
+def raise_if_limited(retry_after: float, detail: str):
+    """요청 제한에 걸렸으면 Retry-After 헤더와 함께 429 반환"""
+    if retry_after > 0:
+        seconds = math.ceil(min(retry_after, 3600))
+        raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(seconds)})
+
+
+async def run_idempotent(scope: str, idempotency_key: Optional[str], fingerprint, func):
+    """Idempotency-Key가 있으면 같은 키의 재시도에 저장된 결과 반환"""
+    if not idempotency_key:
+        return await func()
+    try:
+        return await idempotency_store.run((scope, idempotency_key), fingerprint, func)
+    except IdempotencyKeyConflict:
+        raise HTTPException(status_code=422, detail="같은 Idempotency-Key로 다른 요청이 전송되었습니다.")
+
+
+SUMMARY_COUNT_LABELS = {
+    "completed": r"업데이트 완료",
+    "new_updates": r"신규 업데이트",
+    "partial_or_structural": r"일부\s?반영 or 구조\s?변경",
+    "scheduled": r"업데이트 예정",
+}
+SUMMARY_COUNT_PATTERNS = {
+    key: re.compile(rf"^\s*{label}\s*:\s*(\d+)\s*건", re.MULTILINE)
+    for key, label in SUMMARY_COUNT_LABELS.items()
+}
+SECTION_PATTERNS = {
+    key: re.compile(rf"^■\s*{label}\s*$", re.MULTILINE)
+    for key, label in SUMMARY_COUNT_LABELS.items()
+}
+
+
+def make_preview(content: str, max_length: int = 150) -> str:
+    """목록 카드용 미리보기 (notices.js getPreview와 동일 규칙)"""
+    if len(content) <= max_length:
+        return content
+    return content[:max_length] + "..."
+
+
+def count_summary_items(content: str) -> dict:
+    """요약 섹션의 섹션별 건수 - 요약에 건수가 없으면 섹션 내 ○ 항목 수로 계산"""
+    counts = {}
+    for key, pattern in SUMMARY_COUNT_PATTERNS.items():
+        match = pattern.search(content)
+        if match:
+            counts[key] = int(match.group(1))
+    if counts:
+        return {key: counts.get(key, 0) for key in SUMMARY_COUNT_LABELS}
+    
+    # ■ 섹션 시작 위치 기준으로 본문을 나누어 ○ 항목 수 계산
+    for key, pattern in SECTION_PATTERNS.items():
+        match = pattern.search(content)
+        if not match:
+            continue
+        start = match.end()
+        end = content.find("\n■", start)
+        section = content[start:end if end != -1 else len(content)]
+        counts[key] = sum(1 for line in section.splitlines() if line.strip().startswith("○"))
+    return {key: counts.get(key, 0) for key in SUMMARY_COUNT_LABELS}
+
+
+def index_notice(notice: dict):
+    """미리보기/건수 요약을 계산해 공지에 저장하고 목록용 요약 갱신"""
+    notice["preview"] = make_preview(notice["content"])
+    notice["summary_counts"] = count_summary_items(notice["content"])
+    notice_summaries[notice["id"]] = {f: notice[f] for f in NOTICE_SUMMARY_FIELDS}
+
+
+def index_notice_details(notice_id: str):
+    """이월 항목, 시스템별 최근 공지, 검색 색인 갱신
+
+    API 요청에서는 백그라운드 작업으로 실행되고, 저널 재생 시에는 바로 호출됩니다.
+    """
+    notice = notices_by_id.get(notice_id)
+    if notice is None:
+        return  # 작업 대기 중 삭제됨
+    scheduled_items_by_notice[notice_id] = parse_system_items(notice["content"])
+    notice_index.add(notice_id, f"{notice['title']}\n{notice['content']}")
+    
+    was_latest = [system for system, latest_id in latest_notice_by_system.items() if latest_id == notice_id]
+    if was_latest:
+        # 수정으로 날짜/시스템이 바뀌었을 수 있으므로 관련 시스템 다시 계산
+        refresh_latest_notices(set(was_latest) | set(notice["systems"]))
+        return
+    for system in notice["systems"]:
+        latest_id = latest_notice_by_system.get(system)
+        if latest_id is None or notice_sort_key(notice) >= notice_sort_key(notices_by_id[latest_id]):
+            latest_notice_by_system[system] = notice_id
+
+
+async def schedule_notice_indexing(notice_id: str):
+    await task_scheduler.submit("index", index_notice_details, notice_id, key=notice_id, priority=LOW)
+
+
+def notice_sort_key(notice: dict) -> tuple:
+    return (notice["date"], notice["created_at"])
+
+
+def refresh_latest_notices(systems):
+    """시스템별 최근 공지 다시 계산 (수정/삭제로 최근 공지가 바뀔 수 있을 때)"""
+    for system in systems:
+        candidates = [n for n in notices_db if system in n["systems"]]
+        if candidates:
+            latest_notice_by_system[system] = max(candidates, key=notice_sort_key)["id"]
+        else:
+            latest_notice_by_system.pop(system, None)
+
+
+def find_similar_notices(messages: List[Message]) -> List[dict]:
+    """가장 최근 업무 데이터(없으면 마지막 사용자 메시지)와 비슷한 과거 공지"""
+    user_texts = [m.content for m in messages if m.role == "user"]
+    query = next((text for text in reversed(user_texts) if looks_like_work_data(text)), user_texts[-1])
+    found = notice_index.search(query, RETRIEVAL_TOP_K, RETRIEVAL_MIN_SCORE)
+    return [notices_by_id[notice_id] for notice_id, _ in found]
+
+
+def collect_carried_items(texts: List[str], session_id: str, notice_date: str) -> dict:
+    """대화에 언급된 시스템(없으면 전체)의 이전 공지에서 '업데이트 예정' 항목 수집
+
+    이전 공지는 새 공지 날짜(notice_date)보다 날짜가 앞서고 이 대화(session_id)에서 생성하지 않은 공지 중
+    가장 최근 공지입니다 (수정/재생성 시 자기 공지의 예정 항목이 다시 이월되지 않도록).
+    """
+    systems = detect_systems(texts, template_structure["systems"]) or list(latest_notice_by_system)
+    sources = find_carry_sources(systems, session_id, notice_date)
+    carried = {}
+    for system, notice_id in sources.items():
+        items = scheduled_items_by_notice.get(notice_id, {}).get(system)
+        if items:
+            carried[system] = items
+    return carried
+
+
+def find_carry_sources(systems: List[str], session_id: str, notice_date: str) -> dict:
+    """시스템 -> 이월 대상 공지 id (보통은 최근 공지 색인으로 바로 찾고, 해당하지 않을 때만 전체 조회)"""
+    def eligible(notice: dict) -> bool:
+        return notice["date"] < notice_date and notice_sessions.get(notice["id"]) != session_id
+    
+    sources = {}
+    remaining = set()
+    for system in systems:
+        latest_id = latest_notice_by_system.get(system)
+        if latest_id is None:
+            continue
+        if eligible(notices_by_id[latest_id]):
+            sources[system] = latest_id
+        else:
+            remaining.add(system)
+    
+    if remaining:
+        best = {}
+        for notice in notices_db:
+            if not eligible(notice):
+                continue
+            for system in remaining.intersection(notice["systems"]):
+                if system not in best or notice_sort_key(notice) > notice_sort_key(best[system]):
+                    best[system] = notice
+        sources.update({system: notice["id"] for system, notice in best.items()})
+    return sources
+
+
+def save_notice(notice: dict):
+    """새 공지 저장"""
+    index_notice(notice)
+    notices_db.append(notice)
+    notices_by_id[notice["id"]] = notice
+
+
+def remove_notice(notice_id: str):
+    """공지 삭제"""
+    global notices_db
+    notices_db = [n for n in notices_db if n["id"] != notice_id]
+    notice = notices_by_id.pop(notice_id, None)
+    notice_summaries.pop(notice_id, None)
+    scheduled_items_by_notice.pop(notice_id, None)
+    notice_sessions.pop(notice_id, None)
+    notice_index.remove(notice_id)
+    if notice:
+        refresh_latest_notices([s for s in notice["systems"] if latest_notice_by_system.get(s) == notice_id])
+
+
+def get_or_create_session(session_id: str) -> dict:
+    """채팅 세션 조회 (없으면 생성)"""
+    if session_id not in chat_sessions:
+        chat_sessions[session_id] = {
+            "messages": ChatHistory(session_id, cold_history_store, CHAT_HOT_MESSAGES),
+            "context": create_system_prompt()
+        }
+    return chat_sessions[session_id]
+
+
+def remove_session(session_id: str):
+    """채팅 세션 삭제 (디스크에 옮긴 기록 포함)"""
+    session = chat_sessions.pop(session_id, None)
+    if session:
+        session["messages"].clear_cold()
+
+
+async def append_chat_message(session_id: str, history: ChatHistory, message: Message):
+    """채팅 메시지 추가 및 저널 기록 (seq로 재생 시 중복 방지)"""
+    history.append(message)
+    await journal.append(
+        "chat_append",
+        session_id=session_id,
+        seq=len(history) - 1,
+        role=message.role_id,
+        content=message.content,
+        ts=message.ts
+    )
+
+
+# ==================== 저널 재생/스냅샷 ====================
+
+def apply_journal_record(record: dict):
+    """저널 기록 1건을 메모리 상태에 반영 (여러 번 적용해도 결과가 같아야 함)"""
+    op = record["op"]
+    if op == "notice_put":
+        notice = record["notice"]
+        session_id = record.get("session_id")
+        if session_id:
+            notice_sessions[notice["id"]] = session_id
+        existing = notices_by_id.get(notice["id"])
+        if existing is not None:
+            existing.update(notice)
+            index_notice(existing)
+        else:
+            save_notice(notice)
+        index_notice_details(notice["id"])
+    elif op == "notice_delete":
+        remove_notice(record["id"])
+    elif op == "chat_append":
+        history = get_or_create_session(record["session_id"])["messages"]
+        if record["seq"] == len(history):
+            history.append(Message(ROLE_NAMES[record["role"]], record["content"], record["ts"]))
+    elif op == "chat_clear":
+        remove_session(record["session_id"])
+    elif op == "session_restore":
+        session = get_or_create_session(record["session_id"])
+        session["messages"] = ChatHistory.restore(
+            record["session_id"], cold_history_store, CHAT_HOT_MESSAGES,
+            record["cold_count"],
+            [Message(ROLE_NAMES[role], content, ts) for role, content, ts in record["messages"]]
+        )
+
+
+def snapshot_records():
+    """현재 상태를 저널 기록 목록으로 변환 (압축용, 디스크에 옮긴 채팅 기록은 개수만 저장)"""
+    records = [
+        {"op": "notice_put", "notice": dict(n), "session_id": notice_sessions.get(n["id"])} for n in notices_db
+    ]
+    for session_id, session in chat_sessions.items():
+        history = session["messages"]
+        records.append({
+            "op": "session_restore",
+            "session_id": session_id,
+            "cold_count": history.cold_count,
+            "messages": [(m.role_id, m.content, m.ts) for m in history.hot]
+        })
+    return records
+
+
 def create_system_prompt() -> str:
     """시스템 프롬프트 생성 - 워드 형식 기반 (말머리 태그 없음)"""
     return """
@@ -374,18 +816,33 @@ def create_system_prompt() -> str:
 - OneTeam
 """
 
-def build_chat_history(messages: List[dict]) -> str:
+def build_chat_history(messages: List[Message]) -> str:
     """채팅 기록을 문자열로 변환"""
     history = []
     for msg in messages[-10:]:  # 최근 10개 메시지만
-        role = "사용자" if msg["role"] == "user" else "AI"
-        history.append(f"{role}: {msg['content']}")
+        role = "사용자" if msg.role == "user" else "AI"
+        history.append(f"{role}: {msg.content}")
     return "\n".join(history)
 
 
-def extract_notice_from_response(response: str) -> Optional[dict]:
+def contains_notice(response: str) -> bool:
+    return "### 생성된 공지 ###" in response and "### 생성 완료 ###" in response
+
+
+async def store_generated_notice(response: str, notice_id: str, session_id: Optional[str] = None):
+    """AI 응답에서 공지를 추출해 저장/색인하고 저널에 기록 (백그라운드 작업, 재시도 시 저장은 한 번만)"""
+    if notice_id not in notices_by_id:
+        if extract_notice_from_response(response, notice_id) is None:
+            raise PermanentTaskError("응답에서 공지를 추출하지 못했습니다.")
+        if session_id:
+            notice_sessions[notice_id] = session_id
+        index_notice_details(notice_id)
+    await journal.append("notice_put", notice=notices_by_id[notice_id], session_id=notice_sessions.get(notice_id))
+
+
+def extract_notice_from_response(response: str, notice_id: Optional[str] = None) -> Optional[dict]:
     """AI 응답에서 공지 추출"""
-    if "### 생성된 공지 ###" not in response or "### 생성 완료 ###" not in response:
+    if not contains_notice(response):
         return None
     
     try:
@@ -403,21 +860,22 @@ def extract_notice_from_response(response: str) -> Optional[dict]:
         content = "\n".join(content_lines).strip()
         
         # 기본값으로 공지 생성
-        notice_id = str(uuid.uuid4())
+        notice_id = notice_id or str(uuid.uuid4())
         now = datetime.now().isoformat()
         
         notice = {
             "id": notice_id,
             "title": title,
             "content": content,
-            "systems": ["Smart DERP/POS", "넷오피스", "E-Commerce"],  # 기본값
+            # 시스템별 최근 공지 색인에 쓰이므로 공지에 나온 시스템만 (찾지 못하면 기본값)
+            "systems": parse_notice_systems(content) or ["Smart DERP/POS", "넷오피스", "E-Commerce"],
             "date": datetime.now().strftime("%Y-%m-%d"),
             "created_at": now,
             "updated_at": now
         }
         
-        # DB에 저장
-        notices_db.append(notice)
+        # DB에 저장 (저널 기록은 호출한 쪽에서)
+        save_notice(notice)
         
         return notice
         
@@ -426,6 +884,26 @@ def extract_notice_from_response(response: str) -> Optional[dict]:
         return None
 
 
+@app.get("/api/debug/loop")
+async def get_loop_debug():
+    """이벤트 루프 지연 및 느린 요청 기록 조회"""
+    if not loop_monitor.enabled:
+        raise HTTPException(status_code=404, detail="루프 모니터가 비활성화되어 있습니다.")
+    return JSONResponse(content=loop_monitor.snapshot())
+
+
+@app.get("/api/debug/tasks")
+async def get_task_stats():
+    """백그라운드 작업 큐 길이, 대기 시간(lag), 처리/실패/재시도 수 조회"""
+    return JSONResponse(content=task_scheduler.snapshot())
+
+
+@app.get("/api/debug/models")
+async def get_model_stats():
+    """모델별 호출 수, 지연 시간, 추정 비용 조회"""
+    return JSONResponse(content=model_router.snapshot())
+
+
 @app.get("/api/template-structure")
 async def get_template_structure():
     """템플릿 구조 정보 API"""
@@ -0,0 +1,219 @@
+"""
+멀티 모델 라우팅
+
+대화 단계, 메시지 길이, 업무 데이터 붙여넣기 여부 등 로컬 휴리스틱으로
+각 턴을 분류하여 간단한 질의응답은 빠른(저비용) 모델로, 공지 생성/수정은
+강한 모델로 보냅니다. 모델별 호출 수, 지연 시간, 추정 토큰/비용을 기록합니다.
+"""
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+FAST = "fast"
+STRONG = "strong"
+
+# 공지 생성을 요청하는 표현
+GENERATION_KEYWORDS = ("생성", "만들어", "작성해", "정리해", "변환")
+# 생성된 공지 수정을 요청하는 표현
+REVISION_KEYWORDS = ("수정", "바꿔", "변경해", "추가해", "빼줘", "다시")
+# 붙여넣은 업무 데이터에서 자주 보이는 패턴 (불릿, ~09/05, 250904, 2025.11.24 등)
+WORK_DATA_PATTERN = re.compile(
+    r"(^\s*[-*•○▪■]\s)|(~\s?\d{1,2}/\d{1,2})|(\b\d{6}\b)|(\d{4}[./-]\d{1,2}[./-]\d{1,2})",
+    re.MULTILINE,
+)
+# AI가 업무 데이터를 요청한 직후인지 판단하는 표현
+DATA_REQUEST_HINTS = ("업데이트 내용", "업무 내역", "붙여넣", "상세 내용")
+NOTICE_MARKER = "### 생성된 공지 ###"
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class ModelStats:
+    """모델별 호출 지연/토큰/비용 누적"""
+
+    def __init__(self, name: str, input_price: float, output_price: float, window: int = 500):
+        self.name = name
+        # USD / 1M 토큰
+        self.input_price = input_price
+        self.output_price = output_price
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.total_latency_ms = 0.0
+        self.latencies_ms = deque(maxlen=window)
+
+    def record(self, latency_ms: float, input_tokens: int, output_tokens: int):
+        self.calls += 1
+        self.total_latency_ms += latency_ms
+        self.latencies_ms.append(latency_ms)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+    @property
+    def cost(self) -> float:
+        return (self.input_tokens * self.input_price + self.output_tokens * self.output_price) / 1_000_000
+
+    def to_dict(self) -> dict:
+        ordered = sorted(self.latencies_ms)
+        return {
+            "model": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.total_latency_ms / self.calls, 1) if self.calls else 0.0,
+            "p50_latency_ms": round(ordered[len(ordered) // 2], 1) if ordered else 0.0,
+            "p95_latency_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 1) if ordered else 0.0,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "estimated_cost_usd": round(self.cost, 6),
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사치 (한글 위주 텍스트 기준 약 2자당 1토큰)"""
+    return max(1, len(text) // 2)
+
+
+def looks_like_work_data(text: str, long_message_chars: int = 300) -> bool:
+    """붙여넣은 업무 데이터인지 판단 (길거나 여러 줄이거나 불릿/날짜 패턴이 많음)"""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(text) >= long_message_chars or len(lines) >= 4:
+        return True
+    return len(WORK_DATA_PATTERN.findall(text)) >= 2
+
+
+def _previous_messages(message: str, messages: list) -> list:
+    """이번 사용자 메시지를 제외한 이전 메시지"""
+    return messages[:-1] if messages and messages[-1].content == message else messages
+
+
+def _last_index(messages: list, predicate) -> int:
+    return next((i for i in range(len(messages) - 1, -1, -1) if predicate(messages[i])), -1)
+
+
+def is_generation_turn(message: str, messages: list, long_message_chars: int = 300) -> bool:
+    """이번 턴에 공지를 새로 작성하게 되는지 (대화 단계 기준)
+
+    업무 데이터를 붙여넣었거나, 이전에 붙여넣은 업무 데이터로 아직 공지가 생성되지 않은 경우입니다.
+    시스템 프롬프트상 모델은 날짜/시스템/건수를 하나씩 확인한 뒤 생성하므로 "네", "11월 24일이요" 같은
+    짧은 답변도 이 단계에 속합니다. 생성된 공지의 수정 요청은 포함하지 않습니다.
+    """
+    if looks_like_work_data(message.strip(), long_message_chars):
+        return True
+    previous = _previous_messages(message, messages)
+    last_work_data = _last_index(
+        previous, lambda m: m.role == "user" and looks_like_work_data(m.content, long_message_chars)
+    )
+    last_notice = _last_index(previous, lambda m: m.role == "assistant" and NOTICE_MARKER in m.content)
+    return last_work_data > last_notice
+
+
+def classify_turn(message: str, messages: list, long_message_chars: int = 300) -> str:
+    """현재 사용자 턴을 fast / strong 으로 분류
+
+    messages는 최근 chat_store.Message 목록이며 이번 사용자 메시지가 이미 포함되어 있어도 됩니다.
+    """
+    text = message.strip()
+
+    # 1. 업무 데이터를 붙여넣었거나, 붙여넣은 데이터로 공지를 생성하는 단계 (확인 질문에 대한 짧은 답 포함)
+    if is_generation_turn(message, messages, long_message_chars):
+        return STRONG
+
+    previous = _previous_messages(message, messages)
+    has_notice = any(m.role == "assistant" and NOTICE_MARKER in m.content for m in previous)
+    has_work_data = any(
+        m.role == "user" and looks_like_work_data(m.content, long_message_chars) for m in previous
+    )
+
+    # 2. 이미 생성된 공지의 수정 요청 - 공지 전체를 다시 써야 함
+    if has_notice and any(keyword in text for keyword in REVISION_KEYWORDS):
+        return STRONG
+
+    # 3. 공지를 다시 생성해 달라는 요청 - 생성할 데이터가 아직 없으면 모델은 질문만 하므로 fast
+    if has_work_data and any(keyword in text for keyword in GENERATION_KEYWORDS):
+        return STRONG
+
+    # 4. 직전 AI 메시지가 업무 데이터를 요청했고 여러 줄로 답한 경우
+    last_assistant = next((m.content for m in reversed(previous) if m.role == "assistant"), "")
+    if any(hint in last_assistant for hint in DATA_REQUEST_HINTS) and len(text.splitlines()) > 1:
+        return STRONG
+
+    # 5. 날짜/시스템 확인 같은 짧은 질의응답
+    return FAST
+
+
+class ModelRouter:
+    """턴 분류 결과에 따라 fast / strong 모델로 호출을 분배"""
+
+    def __init__(self, models: Dict[str, object], model_names: Dict[str, str], prices: Dict[str, tuple],
+                 long_message_chars: int = 300):
+        self.models = models
+        self.long_message_chars = long_message_chars
+        self.stats = {tier: ModelStats(model_names[tier], *prices[tier]) for tier in models}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, model_factory) -> "ModelRouter":
+        """환경 변수 기반 생성 - model_factory(모델명)로 모델 객체 생성"""
+        names = {
+            FAST: os.getenv("GEMINI_FAST_MODEL", "gemini-2.5-flash-lite"),
+            STRONG: os.getenv("GEMINI_STRONG_MODEL", "gemini-flash-latest"),
+        }
+        prices = {
+            FAST: (_env_float("GEMINI_FAST_INPUT_PRICE", 0.10), _env_float("GEMINI_FAST_OUTPUT_PRICE", 0.40)),
+            STRONG: (_env_float("GEMINI_STRONG_INPUT_PRICE", 0.30), _env_float("GEMINI_STRONG_OUTPUT_PRICE", 2.50)),
+        }
+        # 두 모델명이 같으면 객체 하나를 공유
+        models = {FAST: model_factory(names[FAST])}
+        models[STRONG] = models[FAST] if names[STRONG] == names[FAST] else model_factory(names[STRONG])
+        return cls(
+            models, names, prices,
+            long_message_chars=int(os.getenv("ROUTER_LONG_MESSAGE_CHARS", 300)),
+        )
+
+    def set_model(self, tier: str, model):
+        self.models[tier] = model
+
+    def route(self, message: str, messages: list) -> str:
+        return classify_turn(message, messages, self.long_message_chars)
+
+    def is_generation_turn(self, message: str, messages: list) -> bool:
+        return is_generation_turn(message, messages, self.long_message_chars)
+
+    def generate(self, prompt: str, tier: str) -> str:
+        """선택된 모델로 생성하고 지연 시간/토큰 사용량 기록"""
+        stats = self.stats[tier]
+        start = time.perf_counter()
+        try:
+            response = self.models[tier].generate_content(prompt)
+            text = response.text
+        except Exception:
+            with self._lock:
+                stats.errors += 1
+            raise
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        usage = getattr(response, "usage_metadata", None)
+        input_tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt)
+        output_tokens = getattr(usage, "candidates_token_count", None) or estimate_tokens(text)
+        with self._lock:
+            stats.record(latency_ms, input_tokens, output_tokens)
+        return text
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            tiers = {tier: stats.to_dict() for tier, stats in self.stats.items()}
+        total_calls = sum(t["calls"] for t in tiers.values())
+        total_latency = sum(s.total_latency_ms for s in self.stats.values())
+        return {
+            "tiers": tiers,
+            "total_calls": total_calls,
+            "avg_latency_ms": round(total_latency / total_calls, 1) if total_calls else 0.0,
+            "estimated_cost_usd": round(sum(t["estimated_cost_usd"] for t in tiers.values()), 6),
+        }
@@ -0,0 +1,193 @@
+"""
+토큰 버킷 기반 요청 제한 (admission control)
+
+세션별 / 클라이언트 IP별 / 전체 요청 수와, 모델에 보내는 프롬프트 토큰 예산을
+토큰 버킷으로 제한합니다. 기본은 프로세스 메모리에 버킷을 두고, 여러 워커가
+한도를 공유해야 하면 SQLite 파일을 공용 저장소로 사용할 수 있습니다.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class Limit(NamedTuple):
+    """분당 보충량(rate_per_min)과 최대 적립량(burst)"""
+    rate_per_min: float
+    burst: float
+
+    @property
+    def rate(self) -> float:
+        return self.rate_per_min / 60
+
+
+# (버킷 키, 차감량, 한도)
+Charge = Tuple[str, float, Limit]
+
+
+def _refill(tokens: float, updated: float, limit: Limit, now: float) -> float:
+    return min(limit.burst, tokens + (now - updated) * limit.rate)
+
+
+def _plan(states: List[Tuple[float, float]], charges: List[Charge], now: float):
+    """버킷 상태와 차감 요청으로 (대기 시간, 차감 후 잔량 목록) 계산 - 하나라도 부족하면 차감하지 않음"""
+    retry_after = 0.0
+    remaining = []
+    for (tokens, updated), (_, cost, limit) in zip(states, charges):
+        available = _refill(tokens, updated, limit, now)
+        # 한도보다 큰 요청은 버킷이 가득 찼을 때 허용 (영원히 거절되지 않도록)
+        cost = min(cost, limit.burst)
+        if available < cost:
+            retry_after = max(retry_after, (cost - available) / limit.rate if limit.rate > 0 else float("inf"))
+        remaining.append(available - cost)
+    return retry_after, remaining
+
+
+class MemoryBackend:
+    """프로세스 내 버킷 저장소"""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._limits: Dict[str, Limit] = {}
+        self._lock = threading.Lock()
+
+    def take(self, charges: List[Charge], now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        with self._lock:
+            states = [self._buckets.get(key, (limit.burst, now)) for key, _, limit in charges]
+            retry_after, remaining = _plan(states, charges, now)
+            if retry_after > 0:
+                return retry_after
+            for (key, _, limit), tokens in zip(charges, remaining):
+                self._buckets[key] = (tokens, now)
+                self._limits[key] = limit
+            if len(self._buckets) > self.max_keys:
+                self._sweep(now)
+            return 0.0
+
+    def _sweep(self, now: float):
+        """다시 가득 찬(=오래 사용하지 않은) 버킷 제거"""
+        for key in [k for k, (tokens, updated) in self._buckets.items()
+                    if _refill(tokens, updated, self._limits[k], now) >= self._limits[k].burst]:
+            del self._buckets[key]
+            del self._limits[key]
+
+
+class SQLiteBackend:
+    """여러 워커 프로세스가 공유하는 SQLite 버킷 저장소
+
+    BEGIN IMMEDIATE로 쓰기 잠금을 잡은 뒤 읽고/갱신하므로 프로세스 간에도 원자적으로 차감됩니다.
+    다른 워커가 잠금을 잡고 있으면 최대 timeout초 기다리므로 이벤트 루프 밖(스레드풀)에서 호출해야 합니다.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, sweep_interval: float = 300):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def take(self, charges: List[Charge], now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                states = []
+                for key, _, limit in charges:
+                    row = cur.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                    states.append(row if row else (limit.burst, now))
+                retry_after, remaining = _plan(states, charges, now)
+                if retry_after == 0:
+                    cur.executemany(
+                        "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                        [(key, tokens, now) for (key, _, _), tokens in zip(charges, remaining)],
+                    )
+                    if now - self._last_sweep > self.sweep_interval:
+                        # 한 시간 이상 사용하지 않은 버킷 정리
+                        cur.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - 3600,))
+                        self._last_sweep = now
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            return retry_after
+
+
+class RateLimiter:
+    """세션/IP/전체 요청 수 및 업스트림 토큰 예산 제한"""
+
+    def __init__(
+        self,
+        backend,
+        session_limit: Limit,
+        ip_limit: Limit,
+        global_limit: Limit,
+        token_limit: Limit,
+        enabled: bool = True,
+    ):
+        self.backend = backend
+        self.session_limit = session_limit
+        self.ip_limit = ip_limit
+        self.global_limit = global_limit
+        self.token_limit = token_limit
+        self.enabled = enabled
+        self.rejected = {"request": 0, "tokens": 0}
+
+    @property
+    def blocking(self) -> bool:
+        """확인이 잠금 대기로 오래 걸릴 수 있는지 (True면 스레드풀에서 호출)"""
+        return self.enabled and self.backend.blocking
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        sqlite_path = os.getenv("RATE_LIMIT_SQLITE_PATH")
+        backend = SQLiteBackend(sqlite_path) if sqlite_path else MemoryBackend()
+        return cls(
+            backend,
+            session_limit=_limit_from_env("RATE_LIMIT_SESSION", 30, 5),
+            ip_limit=_limit_from_env("RATE_LIMIT_IP", 120, 20),
+            global_limit=_limit_from_env("RATE_LIMIT_GLOBAL", 1200, 50),
+            token_limit=_limit_from_env("UPSTREAM_TOKENS", 250_000, 250_000),
+            enabled=os.getenv("RATE_LIMIT_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off"),
+        )
+
+    def check_request(self, session_id: str, client_ip: str) -> float:
+        """요청 1건 허용 여부 - 허용이면 0, 거절이면 재시도까지 기다릴 초"""
+        if not self.enabled:
+            return 0.0
+        retry_after = self.backend.take([
+            (f"session:{session_id}", 1, self.session_limit),
+            (f"ip:{client_ip}", 1, self.ip_limit),
+            ("global", 1, self.global_limit),
+        ])
+        if retry_after:
+            self.rejected["request"] += 1
+        return retry_after
+
+    def check_tokens(self, prompt_tokens: int) -> float:
+        """업스트림 프롬프트 토큰 예산 차감 - 허용이면 0, 거절이면 재시도까지 기다릴 초"""
+        if not self.enabled:
+            return 0.0
+        retry_after = self.backend.take([("upstream_tokens", prompt_tokens, self.token_limit)])
+        if retry_after:
+            self.rejected["tokens"] += 1
+        return retry_after
+
+
+def _limit_from_env(prefix: str, per_min: float, burst: float) -> Limit:
+    return Limit(
+        float(os.getenv(f"{prefix}_PER_MIN", per_min)),
+        float(os.getenv(f"{prefix}_BURST", burst)),
+    )
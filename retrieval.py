@@ -0,0 +1,243 @@
+"""
+비슷한 과거 공지 검색 (공지 생성 시 few-shot 예시용)
+
+공지 본문을 해시된 특징(단어 + 단어 내 글자 bigram)의 TF-IDF 희소 벡터로 만들어 역색인에 보관합니다.
+- 문서 쪽 가중치: 로그 TF를 L2 정규화 (문서마다 idf가 높은 상위 max_features개 특징만 보관)
+- 질의 쪽 가중치: 로그 TF x idf (idf는 검색 시점의 문서 수/문서 빈도로 계산하므로 색인을 다시 만들 필요 없음)
+
+역색인은 특징 기준으로 정렬된 불변 세그먼트(CSR 배열)들로 구성됩니다. 공지를 추가하면 작은 세그먼트를
+만들고 크기가 비슷한 세그먼트끼리 병합하며, max_segment_postings를 넘는 병합은 하지 않아 추가 비용이
+공지 수와 무관하게 유지됩니다. 삭제/수정된 공지는 슬롯만 죽은 것으로 표시하고 병합/압축 때 제거합니다.
+
+특징 해시는 Python hash()를 사용하므로 색인은 프로세스 안에서만 유효합니다 (시작 시 공지에서 다시 만듦).
+"""
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[0-9a-zA-Z가-힣]+")
+
+
+def extract_features(text: str, mask: int) -> Counter:
+    """특징 해시 -> 빈도 (한국어 조사/어미 변화에 덜 민감하도록 글자 bigram 포함)
+
+    날짜/건수 같은 숫자만으로 된 토큰은 내용 유사도와 무관하므로 제외합니다.
+    """
+    counts = Counter()
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token.isdigit():
+            continue
+        counts[hash(token) & mask] += 1
+        if len(token) > 2:
+            counts.update(hash(token[i:i + 2]) & mask for i in range(len(token) - 1))
+    return counts
+
+
+def _to_arrays(counts: Counter) -> Tuple[np.ndarray, np.ndarray]:
+    features = np.fromiter(counts.keys(), np.int64, len(counts))
+    tf = 1 + np.log(np.fromiter(counts.values(), np.float32, len(counts)))
+    return features, tf
+
+
+class _Segment:
+    """특징 정렬 CSR: features[i]의 posting은 slots/weights[indptr[i]:indptr[i + 1]]"""
+
+    __slots__ = ("features", "indptr", "slots", "weights")
+
+    def __init__(self, sorted_features: np.ndarray, slots: np.ndarray, weights: np.ndarray):
+        self.features, starts = np.unique(sorted_features, return_index=True)
+        self.indptr = np.append(starts, len(sorted_features))
+        self.slots = slots
+        self.weights = weights
+
+    @classmethod
+    def build(cls, features: np.ndarray, slots: np.ndarray, weights: np.ndarray) -> "_Segment":
+        order = np.argsort(features, kind="stable")
+        return cls(features[order], slots[order], weights[order])
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def postings(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return np.repeat(self.features, np.diff(self.indptr)), self.slots, self.weights
+
+    def filter(self, alive: np.ndarray, remap: Optional[np.ndarray] = None) -> "_Segment":
+        """죽은 슬롯의 posting 제거 (정렬 순서는 유지됨)"""
+        features, slots, weights = self.postings()
+        keep = alive[slots]
+        slots = slots[keep]
+        return _Segment(features[keep], remap[slots] if remap is not None else slots, weights[keep])
+
+    def lookup(self, query_features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """질의 특징과 일치하는 posting의 (슬롯, 문서 가중치, 질의 특징 위치)"""
+        if not len(self.features):
+            empty = np.zeros(0, np.int32)
+            return empty, np.zeros(0, np.float32), empty
+        pos = np.searchsorted(self.features, query_features)
+        pos[pos == len(self.features)] = 0
+        hit = self.features[pos] == query_features
+        query_index = np.flatnonzero(hit)
+        starts = self.indptr[pos[hit]]
+        lengths = self.indptr[pos[hit] + 1] - starts
+        # 구간 [start, start + length)들을 하나의 인덱스 배열로 펼침
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        return self.slots[offsets], self.weights[offsets], np.repeat(query_index, lengths)
+
+
+class NoticeIndex:
+    """공지 id -> 희소 TF-IDF 벡터 역색인 (증분 추가/삭제)"""
+
+    def __init__(
+        self,
+        dim_bits: int = 20,
+        max_features: int = 256,
+        query_features: int = 64,
+        max_query_postings: int = 100_000,
+        max_segment_postings: int = 1 << 20,
+    ):
+        self.mask = (1 << dim_bits) - 1
+        self.max_features = max_features
+        self.query_features = query_features
+        self.max_query_postings = max_query_postings
+        self.max_segment_postings = max_segment_postings
+        self.clear()
+
+    def clear(self):
+        self.df = np.zeros(self.mask + 1, np.int32)
+        self.ids: List[Optional[str]] = []
+        self.alive = np.zeros(1024, bool)
+        self.slot_of: Dict[str, int] = {}
+        self.doc_features: Dict[int, np.ndarray] = {}
+        self.segments: List[_Segment] = []
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def __contains__(self, notice_id: str) -> bool:
+        return notice_id in self.slot_of
+
+    def _idf(self, df: np.ndarray) -> np.ndarray:
+        return np.log((1 + len(self)) / (1 + df)) + 1
+
+    # ==================== 색인 ====================
+
+    def add(self, notice_id: str, text: str):
+        """공지 추가 (이미 있으면 교체)"""
+        self.remove(notice_id)
+        counts = extract_features(text, self.mask)
+        if not counts:
+            return
+        features, tf = _to_arrays(counts)
+        if len(features) > self.max_features:
+            # 현재까지의 문서 빈도 기준으로 드문(구별력 있는) 특징 우선 보관
+            keep = np.argpartition(-(tf * self._idf(self.df[features])), self.max_features)[:self.max_features]
+            features, tf = features[keep], tf[keep]
+        features = features.astype(np.int32)
+
+        slot = len(self.ids)
+        self.ids.append(notice_id)
+        if slot >= len(self.alive):
+            self.alive = np.concatenate([self.alive, np.zeros(len(self.alive), bool)])
+        self.alive[slot] = True
+        self.slot_of[notice_id] = slot
+        self.doc_features[slot] = features
+        self.df[features] += 1
+
+        weights = (tf / np.linalg.norm(tf)).astype(np.float32)
+        self.segments.append(_Segment.build(features, np.full(len(features), slot, np.int32), weights))
+        self._merge()
+
+    def remove(self, notice_id: str):
+        slot = self.slot_of.pop(notice_id, None)
+        if slot is None:
+            return
+        self.alive[slot] = False
+        self.ids[slot] = None
+        self.df[self.doc_features.pop(slot)] -= 1
+        # 죽은 슬롯이 살아 있는 슬롯보다 많아지면 posting과 슬롯 번호 정리
+        if len(self.ids) - len(self) > max(1024, len(self)):
+            self.compact()
+
+    def _merge(self):
+        while len(self.segments) >= 2:
+            older, newer = self.segments[-2], self.segments[-1]
+            if len(older) > 2 * len(newer) or len(older) + len(newer) > self.max_segment_postings:
+                return
+            parts = [older.postings(), newer.postings()]
+            features, slots, weights = (np.concatenate(arrays) for arrays in zip(*parts))
+            keep = self.alive[slots]
+            self.segments[-2:] = [_Segment.build(features[keep], slots[keep], weights[keep])]
+
+    def compact(self):
+        """죽은 posting 제거 및 슬롯 번호 재배정"""
+        count = len(self.ids)
+        alive = self.alive[:count]
+        remap = (np.cumsum(alive) - 1).astype(np.int32)
+        self.segments = [s for s in (seg.filter(alive, remap) for seg in self.segments) if len(s)]
+        self.doc_features = {int(remap[slot]): features for slot, features in self.doc_features.items()}
+        self.ids = [notice_id for notice_id in self.ids if notice_id is not None]
+        self.slot_of = {notice_id: slot for slot, notice_id in enumerate(self.ids)}
+        self.alive = np.zeros(max(1024, len(self.ids) * 2), bool)
+        self.alive[:len(self.ids)] = True
+
+    # ==================== 검색 ====================
+
+    def search(self, text: str, k: int = 3, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """(공지 id, 유사도) 목록 - 유사도가 높은 순"""
+        if not self.slot_of:
+            return []
+        counts = extract_features(text, self.mask)
+        if not counts:
+            return []
+        features, tf = _to_arrays(counts)
+        df = self.df[features]
+        indexed = df > 0
+        features, tf, df = features[indexed], tf[indexed], df[indexed]
+        if not len(features):
+            return []
+        # 가중치가 높은 특징부터 최대 query_features개, 읽을 posting 수가 max_query_postings를
+        # 넘지 않는 만큼만 사용 (흔한 특징은 posting이 길고 구별력이 낮음) - 검색 시간 상한
+        weights = tf * self._idf(df)
+        order = np.argsort(-weights)[:self.query_features]
+        within_budget = np.cumsum(df[order]) <= self.max_query_postings
+        order = order[within_budget] if within_budget[0] else order[:1]
+        features, weights = features[order], weights[order]
+        weights = (weights / np.linalg.norm(weights)).astype(np.float32)
+
+        found = [seg.lookup(features) for seg in self.segments]
+        slots = np.concatenate([f[0] for f in found])
+        contrib = np.concatenate([f[1] * weights[f[2]] for f in found])
+        scores = np.bincount(slots, contrib, minlength=len(self.ids))
+        scores[~self.alive[:len(self.ids)]] = 0
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[slot], float(scores[slot])) for slot in top if scores[slot] > min_score]
+
+
+def build_examples_section(notices: List[dict], max_chars: int) -> str:
+    """비슷한 과거 공지를 형식 예시로 전달 (전체 max_chars 이내, 넘치면 뒤쪽 공지를 잘라냄)"""
+    examples = []
+    remaining = max_chars
+    for notice in notices:
+        if remaining <= 0:
+            break
+        content = notice["content"]
+        if len(content) > remaining:
+            content = content[:remaining].rstrip() + "\n..."
+        remaining -= len(content)
+        examples.append(f"### 예시 {len(examples) + 1}: {notice['title']}\n{content}")
+    if not examples:
+        return ""
+    joined = "\n\n".join(examples)
+    return f"""
+## 비슷한 과거 공지 (형식 참고용)
+아래는 사용자가 제공한 데이터와 비슷한 과거 공지입니다. 섹션 구성, 항목 표기, 문체를 참고하되 내용은 사용자 데이터만 사용하세요.
+
+{joined}
+"""
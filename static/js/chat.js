@@ -1,11 +1,18 @@
 // 세션 ID 생성
 const sessionId = generateSessionId();
 let currentNotice = null;
+// 아직 성공 응답을 받지 못한 메시지와 Idempotency-Key (같은 메시지를 다시 보내면 같은 키 사용)
+let pendingChat = null;
+const CHAT_NETWORK_RETRIES = 2;
 
 function generateSessionId() {
     return 'session_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
 }
 
+function generateIdempotencyKey() {
+    return 'req_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
+}
+
 // 페이지 로드 시
 document.addEventListener('DOMContentLoaded', function () {
     const messageInput = document.getElementById('messageInput');
@@ -34,6 +41,12 @@ document.getElementById('chatForm').addEventListener('submit', async function (e
 
     if (!message) return;
 
+    // 실패한 메시지를 다시 보내는 경우 같은 키를 재사용해 서버에서 한 번만 처리되도록 함
+    if (!pendingChat || pendingChat.message !== message) {
+        pendingChat = { message: message, idempotencyKey: generateIdempotencyKey() };
+    }
+    const idempotencyKey = pendingChat.idempotencyKey;
+
     // 사용자 메시지 표시
     addMessage('user', message);
 
@@ -52,22 +65,19 @@ document.getElementById('chatForm').addEventListener('submit', async function (e
         formData.append('message', message);
         formData.append('session_id', sessionId);
 
-        const response = await fetch('/api/chat', {
-            method: 'POST',
-            body: formData
-        });
+        const response = await postChat(formData, idempotencyKey);
 
         const data = await response.json();
 
         if (data.success) {
+            pendingChat = null;
+
             // AI 응답 표시
             addMessage('assistant', data.message);
 
-            // 공지가 생성되었으면 미리보기 표시
-            if (data.notice_generated && data.notice) {
-                currentNotice = data.notice;
-                showPreview(data.notice);
-                showNotification('✅ 공지가 생성되어 저장되었습니다!', 'success');
+            // 공지가 생성되었으면 저장(백그라운드 처리) 완료 후 미리보기 표시
+            if (data.notice_generated && data.notice_id) {
+                showStoredNotice(data.notice_id);
             }
         } else {
             throw new Error(data.detail || '메시지 전송 실패');
@@ -77,6 +87,10 @@ document.getElementById('chatForm').addEventListener('submit', async function (e
         console.error('Error:', error);
         addMessage('assistant', '죄송합니다. 오류가 발생했습니다. 다시 시도해주세요.');
         showNotification('오류: ' + error.message, 'error');
+        // 다시 보내기 쉽도록 입력창에 복원 (같은 내용이면 같은 키로 재전송)
+        if (!messageInput.value) {
+            messageInput.value = message;
+        }
     } finally {
         // 전송 버튼 활성화
         sendBtn.disabled = false;
@@ -149,6 +163,53 @@ function escapeHtml(text) {
     return div.innerHTML.replace(/\n/g, '<br>');
 }
 
+// 채팅 요청 전송 - 네트워크 오류는 같은 Idempotency-Key로 재시도
+// (서버가 이미 처리한 요청이면 다시 생성하지 않고 저장된 결과를 돌려줌)
+async function postChat(formData, idempotencyKey) {
+    for (let attempt = 0; ; attempt++) {
+        try {
+            return await fetch('/api/chat', {
+                method: 'POST',
+                headers: { 'Idempotency-Key': idempotencyKey },
+                body: formData
+            });
+        } catch (error) {
+            if (attempt >= CHAT_NETWORK_RETRIES) {
+                throw error;
+            }
+            await new Promise(resolve => setTimeout(resolve, 500 * (attempt + 1)));
+        }
+    }
+}
+
+// 생성된 공지는 서버에서 백그라운드로 저장되므로 저장 작업이 끝날 때까지 상태 조회
+async function showStoredNotice(noticeId, attempts = 40) {
+    try {
+        for (let i = 0; i < attempts; i++) {
+            const statusResponse = await fetch(`/api/notices/${noticeId}/tasks`);
+            if (statusResponse.ok) {
+                const status = await statusResponse.json();
+                const store = status.tasks.store;
+                if (store && store.state === 'failed') {
+                    throw new Error(store.error || '공지 저장 실패');
+                }
+                if (status.stored) {
+                    const response = await fetch(`/api/notices/${noticeId}`);
+                    currentNotice = await response.json();
+                    showPreview(currentNotice);
+                    showNotification('✅ 공지가 생성되어 저장되었습니다!', 'success');
+                    return;
+                }
+            }
+            await new Promise(resolve => setTimeout(resolve, 250));
+        }
+        throw new Error('공지 저장이 지연되고 있습니다. 잠시 후 공지 목록에서 확인해주세요.');
+    } catch (error) {
+        console.error('Error:', error);
+        showNotification('오류: ' + error.message, 'error');
+    }
+}
+
 // 미리보기 표시
 function showPreview(notice) {
     const previewPanel = document.getElementById('previewPanel');
@@ -1,12 +1,13 @@
 let allNotices = [];
 let currentNoticeId = null;
+let currentNotice = null;  // 상세 조회로 불러온 전체 공지 (본문 포함)
 
 // 페이지 로드 시 공지 목록 불러오기
 document.addEventListener('DOMContentLoaded', function () {
     loadNotices();
 });
 
-// 공지 목록 불러오기
+// 공지 목록 불러오기 (본문 제외 요약만 받고, 본문은 카드를 열 때 조회)
 async function loadNotices() {
     try {
         const response = await fetch('/api/notices');
@@ -45,7 +46,7 @@ function displayNotices(notices) {
                     <span class="system-badge">${escapeHtml(sys)}</span>
                 `).join('')}
             </div>
-            <div class="notice-preview">${escapeHtml(getPreview(notice.content))}</div>
+            <div class="notice-preview">${escapeHtml(notice.preview ?? getPreview(notice.content || ''))}</div>
             <div class="notice-footer">
                 <div class="notice-meta">
                     생성: ${formatDateTime(notice.created_at)}
@@ -62,6 +63,7 @@ async function viewNoticeDetail(noticeId) {
         const notice = await response.json();
 
         currentNoticeId = noticeId;
+        currentNotice = notice;
 
         document.getElementById('detailTitle').textContent = notice.title;
         document.getElementById('detailDate').textContent = formatDate(notice.date);
@@ -84,6 +86,7 @@ async function viewNoticeDetail(noticeId) {
 function closeModal() {
     document.getElementById('noticeModal').style.display = 'none';
     currentNoticeId = null;
+    currentNotice = null;
 }
 
 // 공지 내용 복사
@@ -117,7 +120,7 @@ function downloadNoticeContent() {
 
 // 공지 수정 모달 열기
 function editNotice() {
-    const notice = allNotices.find(n => n.id === currentNoticeId);
+    const notice = currentNotice;
     if (!notice) return;
 
     document.getElementById('editNoticeId').value = notice.id;
@@ -215,20 +218,36 @@ async function deleteNotice(noticeId) {
     }
 }
 
-// 공지 필터링
-function filterNotices() {
-    const searchTerm = document.getElementById('searchInput').value.toLowerCase();
-    const systemFilter = document.getElementById('systemFilter').value;
+// 공지 필터링 - 목록에는 본문이 없으므로 검색어는 서버에서 본문 전체를 대상으로 검색
+let searchTimer = null;
+let searchRequestId = 0;
 
-    const filtered = allNotices.filter(notice => {
-        const matchesSearch = notice.title.toLowerCase().includes(searchTerm) ||
-            notice.content.toLowerCase().includes(searchTerm);
-        const matchesSystem = !systemFilter || notice.systems.includes(systemFilter);
+function filterNotices() {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(applyNoticeFilters, 200);
+}
 
-        return matchesSearch && matchesSystem;
-    });
+async function applyNoticeFilters() {
+    const searchTerm = document.getElementById('searchInput').value.trim();
+    const systemFilter = document.getElementById('systemFilter').value;
+    const requestId = ++searchRequestId;
+
+    let notices = allNotices;
+    if (searchTerm) {
+        try {
+            const response = await fetch(`/api/notices?q=${encodeURIComponent(searchTerm)}`);
+            const data = await response.json();
+            notices = data.notices || [];
+        } catch (error) {
+            console.error('Error searching notices:', error);
+            showNotification('공지 검색에 실패했습니다.', 'error');
+            return;
+        }
+        // 입력 중 이전 검색 응답이 늦게 도착한 경우 무시
+        if (requestId !== searchRequestId) return;
+    }
 
-    displayNotices(filtered);
+    displayNotices(notices.filter(notice => !systemFilter || notice.systems.includes(systemFilter)));
 }
 
 // 헬퍼 함수들
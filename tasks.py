@@ -0,0 +1,245 @@
+"""
+백그라운드 작업 스케줄러
+
+응답에 필요 없는 후속 작업(생성된 공지 추출/저장, 색인 등)을 요청 처리 경로 밖에서 실행합니다.
+- 우선순위(high / normal / low)별 크기 제한 큐: 큐가 가득 차면 submit이 빈 자리가 날 때까지 대기 (배압)
+- asyncio 워커 여러 개가 우선순위가 높은 큐부터 꺼내 실행
+- 실패 시 지수 백오프로 재시도 (PermanentTaskError는 재시도하지 않음)
+- 작업 키(공지 id)별 상태 조회, 큐 길이/대기 시간(lag)/실행 시간 지표
+
+작업 함수는 이벤트 루프에서 실행되므로 오래 걸리는 동기 처리는 스레드로 넘겨야 하고,
+재시도될 수 있으므로 멱등이어야 합니다. 작업 안에서 다시 submit 하면 큐가 가득 찼을 때
+워커끼리 서로를 기다릴 수 있으므로, 이어지는 처리는 같은 작업 안에서 바로 호출합니다.
+
+TASK_WORKERS=0이면 큐 없이 submit을 호출한 요청 안에서 바로 실행합니다 (기존 동작과 비교용).
+"""
+import asyncio
+import inspect
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+HIGH = 0
+NORMAL = 1
+LOW = 2
+PRIORITY_NAMES = ("high", "normal", "low")
+
+
+class PermanentTaskError(Exception):
+    """재시도해도 성공할 수 없는 작업 오류"""
+
+
+class Task:
+    __slots__ = ("name", "func", "args", "key", "priority", "attempts", "enqueued_at")
+
+    def __init__(self, name: str, func: Callable, args: tuple, key: Optional[str], priority: int):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.key = key
+        self.priority = priority
+        self.attempts = 0
+        self.enqueued_at = time.monotonic()
+
+
+def _summary(values: Deque[float]) -> dict:
+    ordered = sorted(values)
+    if not ordered:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "p50": round(ordered[len(ordered) // 2], 1),
+        "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+class TaskScheduler:
+    """우선순위 큐 + asyncio 워커 풀"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = 1000,
+        max_retries: int = 3,
+        retry_base_ms: float = 200.0,
+        status_limit: int = 10_000,
+        window: int = 1000,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.retry_base = retry_base_ms / 1000
+        self.status_limit = status_limit
+
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "retried": 0}
+        self.lags_ms = deque(maxlen=window)
+        self.run_ms = deque(maxlen=window)
+        self.running = 0
+        # 작업 키 -> {작업 이름: 상태}
+        self._status: "OrderedDict[str, Dict[str, dict]]" = OrderedDict()
+
+        self._queues: Optional[List[asyncio.Queue]] = None
+        self._ready: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._unfinished = 0
+        self._worker_tasks: List[asyncio.Task] = []
+        self._retry_tasks = set()
+
+    @classmethod
+    def from_env(cls) -> "TaskScheduler":
+        return cls(
+            workers=int(os.getenv("TASK_WORKERS", 2)),
+            queue_size=int(os.getenv("TASK_QUEUE_SIZE", 1000)),
+            max_retries=int(os.getenv("TASK_MAX_RETRIES", 3)),
+            retry_base_ms=float(os.getenv("TASK_RETRY_BASE_MS", 200)),
+            status_limit=int(os.getenv("TASK_STATUS_LIMIT", 10_000)),
+        )
+
+    # ==================== 시작/종료 ====================
+
+    async def start(self):
+        if self.workers <= 0 or self._worker_tasks:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in PRIORITY_NAMES]
+        self._ready = asyncio.Semaphore(0)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """대기 중인 작업(재시도 포함)을 timeout 동안 처리한 뒤 워커 종료"""
+        if not self._worker_tasks:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            print(f"처리하지 못한 백그라운드 작업: {self._unfinished}건")
+        for task in [*self._worker_tasks, *self._retry_tasks]:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, *self._retry_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._retry_tasks.clear()
+        self._queues = None
+
+    # ==================== 작업 등록/실행 ====================
+
+    async def submit(self, name: str, func: Callable, *args, key: Optional[str] = None, priority: int = NORMAL):
+        """작업 등록 - 해당 우선순위 큐가 가득 차 있으면 빈 자리가 날 때까지 대기"""
+        task = Task(name, func, args, key, priority)
+        self.stats["submitted"] += 1
+        self._set_status(task, "queued")
+        if self._queues is None:
+            await self._run_inline(task)
+            return
+        self._unfinished += 1
+        self._idle.clear()
+        await self._enqueue(task)
+
+    async def _enqueue(self, task: Task):
+        task.enqueued_at = time.monotonic()
+        await self._queues[task.priority].put(task)
+        self._ready.release()
+
+    async def _worker(self):
+        while True:
+            await self._ready.acquire()
+            # 세마포어 값 = 전체 큐의 작업 수이므로 항상 하나는 꺼낼 수 있음
+            task = next(queue.get_nowait() for queue in self._queues if not queue.empty())
+            retry_delay = await self._attempt(task)
+            if retry_delay is None:
+                self._finish()
+            else:
+                retry = asyncio.create_task(self._retry(task, retry_delay))
+                self._retry_tasks.add(retry)
+                retry.add_done_callback(self._retry_tasks.discard)
+
+    async def _retry(self, task: Task, delay: float):
+        await asyncio.sleep(delay)
+        await self._enqueue(task)
+
+    async def _run_inline(self, task: Task):
+        while True:
+            retry_delay = await self._attempt(task)
+            if retry_delay is None:
+                return
+            await asyncio.sleep(retry_delay)
+
+    async def _attempt(self, task: Task) -> Optional[float]:
+        """작업 1회 실행 - 재시도가 필요하면 대기 시간(초), 아니면 None"""
+        self.lags_ms.append((time.monotonic() - task.enqueued_at) * 1000)
+        task.attempts += 1
+        self.running += 1
+        self._set_status(task, "running")
+        start = time.monotonic()
+        try:
+            result = task.func(*task.args)
+            if inspect.isawaitable(result):
+                await result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if isinstance(e, PermanentTaskError) or task.attempts > self.max_retries:
+                self.stats["failed"] += 1
+                self._set_status(task, "failed", str(e))
+                print(f"백그라운드 작업 실패: {task.name} ({task.key}) - {e}")
+                return None
+            self.stats["retried"] += 1
+            self._set_status(task, "retrying", str(e))
+            return self.retry_base * 2 ** (task.attempts - 1)
+        finally:
+            self.running -= 1
+            self.run_ms.append((time.monotonic() - start) * 1000)
+        self.stats["completed"] += 1
+        self._set_status(task, "done")
+        return None
+
+    def _finish(self):
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._idle.set()
+
+    # ==================== 상태/지표 ====================
+
+    def _set_status(self, task: Task, state: str, error: Optional[str] = None):
+        if task.key is None:
+            return
+        tasks = self._status.get(task.key)
+        if tasks is None:
+            tasks = self._status[task.key] = {}
+            if len(self._status) > self.status_limit:
+                self._status.popitem(last=False)
+        else:
+            self._status.move_to_end(task.key)
+        tasks[task.name] = {
+            "state": state,
+            "priority": PRIORITY_NAMES[task.priority],
+            "attempts": task.attempts,
+            "error": error,
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    def status(self, key: str) -> Optional[Dict[str, dict]]:
+        """작업 키의 작업별 상태 (기록이 없으면 None)"""
+        return self._status.get(key)
+
+    @property
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues) if self._queues else 0
+
+    def snapshot(self) -> dict:
+        queues = {
+            name: {"depth": self._queues[priority].qsize() if self._queues else 0, "max": self.queue_size}
+            for priority, name in enumerate(PRIORITY_NAMES)
+        }
+        return {
+            "workers": len(self._worker_tasks),
+            "running": self.running,
+            "queues": queues,
+            "depth": self.depth,
+            "unfinished": self._unfinished,
+            **self.stats,
+            "lag_ms": _summary(self.lags_ms),
+            "run_ms": _summary(self.run_ms),
+        }
@@ -0,0 +1,174 @@
+"""
+저널(journal.Journal) 복구 테스트 - 재생, 압축, 끊긴 마지막 줄, 기록/압축 실패
+
+실행:
+    python -m pytest tests
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from journal import SNAPSHOT_FILE, Journal  # noqa: E402
+
+
+class Store:
+    """main.py의 공지 저장소처럼 기록을 멱등하게 적용하는 상태"""
+
+    def __init__(self):
+        self.items = {}
+
+    def apply(self, record: dict):
+        if record["op"] == "put":
+            self.items[record["id"]] = record["value"]
+        elif record["op"] == "delete":
+            self.items.pop(record["id"], None)
+
+    def snapshot(self):
+        return [{"op": "put", "id": key, "value": value} for key, value in self.items.items()]
+
+
+class JournalTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    async def open(self, **options) -> tuple:
+        store = Store()
+        journal = Journal(str(self.directory), **{"mode": "sync", **options})
+        await journal.start(store.apply, store.snapshot)
+        return journal, store
+
+    async def put(self, journal: Journal, store: Store, key: str, value):
+        store.apply({"op": "put", "id": key, "value": value})
+        await asyncio.wait_for(journal.append("put", id=key, value=value), 5)
+
+    async def reopen(self) -> dict:
+        journal, store = await self.open()
+        await journal.stop()
+        return store.items
+
+    def journal_files(self) -> list:
+        return sorted(self.directory.glob("journal-*.log"))
+
+    async def test_replay_after_restart(self):
+        journal, store = await self.open()
+        await self.put(journal, store, "a", 1)
+        await self.put(journal, store, "b", 2)
+        store.apply({"op": "delete", "id": "a"})
+        await journal.append("delete", id="a")
+        await self.put(journal, store, "b", 3)
+        await journal.stop()
+
+        self.assertEqual(await self.reopen(), {"b": 3})
+
+    async def test_batched_records_are_written_on_stop(self):
+        journal, store = await self.open(mode="batched", batch_ms=10_000)
+        for i in range(10):
+            await self.put(journal, store, str(i), i)
+        await journal.stop()
+
+        self.assertEqual(await self.reopen(), {str(i): i for i in range(10)})
+
+    async def test_compaction_writes_snapshot_and_removes_old_generations(self):
+        journal, store = await self.open(compact_bytes=1)
+        for i in range(5):
+            await self.put(journal, store, str(i), i)
+        await journal.stop()
+
+        self.assertGreater(journal.stats["compactions"], 0)
+        snapshot = (self.directory / SNAPSHOT_FILE).read_text(encoding="utf-8").splitlines()
+        generation = json.loads(snapshot[0])["generation"]
+        self.assertTrue(all(int(p.stem.split("-")[1]) >= generation for p in self.journal_files()))
+        self.assertEqual(await self.reopen(), {str(i): i for i in range(5)})
+
+    async def test_torn_tail_keeps_earlier_records(self):
+        journal, store = await self.open()
+        await self.put(journal, store, "a", 1)
+        await self.put(journal, store, "b", 2)
+        await journal.stop()
+        # 기록 도중 종료되어 마지막 줄이 끊긴 상태
+        with open(self.journal_files()[-1], "ab") as f:
+            f.write(b'{"op": "put", "id": "c", "val')
+
+        journal, store = await self.open()
+        self.assertEqual(store.items, {"a": 1, "b": 2})
+        await self.put(journal, store, "d", 4)
+        await journal.stop()
+
+        self.assertEqual(await self.reopen(), {"a": 1, "b": 2, "d": 4})
+
+    async def test_failed_write_is_retried_in_new_generation(self):
+        journal, store = await self.open()
+        await self.put(journal, store, "a", 1)
+
+        write = journal._write
+        failures = []
+
+        def torn_write(file, data):
+            if not failures:
+                failures.append(data)
+                file.write(data[:len(data) // 2])
+                file.flush()
+                raise OSError(28, "No space left on device")
+            write(file, data)
+
+        journal._write = torn_write
+        with self.assertRaises(OSError):
+            await self.put(journal, store, "b", 2)
+        await self.put(journal, store, "c", 3)
+        await journal.stop()
+
+        self.assertEqual(journal.stats["flush_errors"], 1)
+        self.assertEqual(await self.reopen(), {"a": 1, "b": 2, "c": 3})
+
+    async def test_failed_batch_is_retried_without_new_records(self):
+        journal, store = await self.open(mode="batched", batch_ms=1)
+        write = journal._write
+        failures = []
+
+        def failing_write(file, data):
+            if not failures:
+                failures.append(data)
+                raise OSError(28, "No space left on device")
+            write(file, data)
+
+        journal._write = failing_write
+        await self.put(journal, store, "a", 1)
+        for _ in range(100):
+            if journal.stats["flushes"]:
+                break
+            await asyncio.sleep(0.05)
+        self.assertEqual(journal.stats["flushes"], 1)
+        self.assertFalse(journal._pending)
+        await journal.stop()
+
+        self.assertEqual(await self.reopen(), {"a": 1})
+
+    async def test_compaction_failure_does_not_stop_flusher(self):
+        journal, store = await self.open(compact_bytes=1)
+
+        def fail_snapshot(records, generation):
+            raise OSError(28, "No space left on device")
+
+        journal._write_snapshot = fail_snapshot
+        for i in range(3):
+            await self.put(journal, store, str(i), i)
+        self.assertFalse(journal._task.done())
+        await journal.stop()
+
+        self.assertEqual(journal.stats["compact_errors"], 1)
+        self.assertEqual(await self.reopen(), {str(i): i for i in range(3)})
+
+
+if __name__ == "__main__":
+    unittest.main()